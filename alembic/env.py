@@ -14,6 +14,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Migrate the database the application is configured for (DATABASE_URL / SQLITE_PATH)
+from app import config as app_config
+config.set_main_option("sqlalchemy.url", app_config.DATABASE_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 from app.database import Base
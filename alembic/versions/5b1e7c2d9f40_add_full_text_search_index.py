@@ -0,0 +1,96 @@
+"""add_full_text_search_index
+
+Revision ID: 5b1e7c2d9f40
+Revises: 30ed649a8312
+Create Date: 2026-10-18 09:12:41.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c2d9f40'
+down_revision: Union[str, None] = '30ed649a8312'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+            name, description, status, tags,
+            content='projects', content_rowid='id',
+            prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+            INSERT INTO projects_fts(rowid, name, description, status, tags)
+            VALUES (new.id, new.name, new.description, new.status, new.tags);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+            INSERT INTO projects_fts(projects_fts, rowid, name, description, status, tags)
+            VALUES ('delete', old.id, old.name, old.description, old.status, old.tags);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS projects_fts_au
+        AFTER UPDATE OF name, description, status, tags ON projects BEGIN
+            INSERT INTO projects_fts(projects_fts, rowid, name, description, status, tags)
+            VALUES ('delete', old.id, old.name, old.description, old.status, old.tags);
+            INSERT INTO projects_fts(rowid, name, description, status, tags)
+            VALUES (new.id, new.name, new.description, new.status, new.tags);
+        END
+    """)
+
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, description, status,
+            content='tasks', content_rowid='id',
+            prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, title, description, status)
+            VALUES (new.id, new.title, new.description, new.status);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description, status)
+            VALUES ('delete', old.id, old.title, old.description, old.status);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_au
+        AFTER UPDATE OF title, description, status ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description, status)
+            VALUES ('delete', old.id, old.title, old.description, old.status);
+            INSERT INTO tasks_fts(rowid, title, description, status)
+            VALUES (new.id, new.title, new.description, new.status);
+        END
+    """)
+
+    # Index the rows that already exist
+    op.execute("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')")
+    op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for trigger in ("tasks_fts_au", "tasks_fts_ad", "tasks_fts_ai",
+                    "projects_fts_au", "projects_fts_ad", "projects_fts_ai"):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS tasks_fts")
+    op.execute("DROP TABLE IF EXISTS projects_fts")
@@ -0,0 +1,46 @@
+"""add_counters_table
+
+Revision ID: 8d3f0a6b2c71
+Revises: 5b1e7c2d9f40
+Create Date: 2026-10-18 10:02:17.552904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f0a6b2c71'
+down_revision: Union[str, None] = '5b1e7c2d9f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'counters',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+    # Seed the counters from the rows that already exist
+    op.execute("INSERT INTO counters (name, value) SELECT 'projects.total', COUNT(*) FROM projects")
+    op.execute(
+        "INSERT INTO counters (name, value) "
+        "SELECT 'projects.status.' || status, COUNT(*) FROM projects "
+        "WHERE status IS NOT NULL GROUP BY status"
+    )
+    op.execute("INSERT INTO counters (name, value) SELECT 'tasks.total', COUNT(*) FROM tasks")
+    op.execute(
+        "INSERT INTO counters (name, value) "
+        "SELECT 'tasks.status.' || status, COUNT(*) FROM tasks "
+        "WHERE status IS NOT NULL GROUP BY status"
+    )
+    op.execute("INSERT INTO counters (name, value) SELECT 'users.total', COUNT(*) FROM users")
+
+
+def downgrade() -> None:
+    op.drop_table('counters')
@@ -0,0 +1,34 @@
+"""cascade_task_project_fk
+
+Revision ID: b6e2c9d4f8a3
+Revises: a1d5f7c3e9b2
+Create Date: 2026-10-18 16:48:51.270334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2c9d4f8a3'
+down_revision: Union[str, None] = 'a1d5f7c3e9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite cannot alter a constraint without rebuilding the table (and
+    # its FTS triggers); project deletion removes tasks explicitly there
+    if op.get_bind().dialect.name == "sqlite":
+        return
+    op.drop_constraint('tasks_project_id_fkey', 'tasks', type_='foreignkey')
+    op.create_foreign_key('tasks_project_id_fkey', 'tasks', 'projects', ['project_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        return
+    op.drop_constraint('tasks_project_id_fkey', 'tasks', type_='foreignkey')
+    op.create_foreign_key('tasks_project_id_fkey', 'tasks', 'projects', ['project_id'], ['id'])
@@ -0,0 +1,64 @@
+"""add_postgres_search_indexes
+
+Revision ID: e2a7c4f9b1d6
+Revises: d8f1b3a5c7e9
+Create Date: 2026-10-18 19:26:03.447126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c4f9b1d6'
+down_revision: Union[str, None] = 'd8f1b3a5c7e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mirrors app.models.search at the time of this revision
+PROJECTS_TSVECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(tags, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(status, '')), 'D')"
+)
+TASKS_TSVECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(status, '')), 'D')"
+)
+
+INDEXES = [
+    ("ix_projects_search", f"projects USING gin (({PROJECTS_TSVECTOR}))"),
+    ("ix_tasks_search", f"tasks USING gin (({TASKS_TSVECTOR}))"),
+]
+# Only where the server ships pg_trgm; search then skips its fuzzy fallback
+TRIGRAM_INDEXES = [
+    ("ix_projects_name_trgm", "projects USING gin (name gin_trgm_ops)"),
+    ("ix_tasks_title_trgm", "tasks USING gin (title gin_trgm_ops)"),
+]
+
+
+def upgrade() -> None:
+    # SQLite searches through the FTS5 tables of 5b1e7c2d9f40
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    indexes = list(INDEXES)
+    if bind.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        indexes += TRIGRAM_INDEXES
+    # Built without blocking writes, which CONCURRENTLY cannot do in a transaction
+    with op.get_context().autocommit_block():
+        for name, definition in indexes:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES + TRIGRAM_INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,228 @@
+"""
+Static assets and HTML page shells.
+
+`python -m app.assets` builds STATIC_BUILD_DIR from static/: every file
+is written under its own name and under a fingerprinted one carrying a
+hash of its content (css/login.css -> css/login.3f9a0c2d1e.css), text
+files also as .gz and, when the optional brotli package is installed,
+.br variants, plus a manifest.json mapping original to fingerprinted
+names. Without a build (development) the app fingerprints static/ in
+memory at first use and serves the files uncompressed and revalidated.
+
+Templates link assets with `asset('css/login.css')`, so pages always
+reference fingerprinted URLs; built ones are served with a year-long
+immutable Cache-Control, as a changed file gets a new URL. The pages
+carry no per-request data, so each is rendered once per process and kept
+with its gzip variant and ETag: restart the app after editing templates
+or assets.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.staticfiles import StaticFiles
+
+from app import config
+from app.compression import accepts_encoding
+from app.services.conditional import is_not_modified, make_etag
+
+try:  # optional: brotli variants are only built when it is installed
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = "static"
+TEMPLATES_DIR = "templates"
+MANIFEST_NAME = "manifest.json"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Preferred first; the suffix of each precompressed variant
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_SUFFIXES = frozenset({".css", ".js", ".html", ".svg", ".json", ".txt", ".map"})
+
+
+def fingerprint(name: str, content: bytes) -> str:
+    root, ext = os.path.splitext(name)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:10]}{ext}"
+
+
+def _source_files(source: str):
+    for directory, _, files in os.walk(source):
+        for filename in sorted(files):
+            path = os.path.join(directory, filename)
+            yield os.path.relpath(path, source).replace(os.sep, "/"), path
+
+
+def _compressed_variants(name: str, content: bytes) -> Dict[str, bytes]:
+    if os.path.splitext(name)[1] not in COMPRESSIBLE_SUFFIXES:
+        return {}
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    # A variant that does not save anything is not worth negotiating
+    return {suffix: data for suffix, data in variants.items() if len(data) < len(content)}
+
+
+def build(source: str = STATIC_DIR, target: Optional[str] = None) -> Dict[str, str]:
+    """Write fingerprinted, precompressed assets and the manifest to `target`."""
+    target = target or config.STATIC_BUILD_DIR
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    names = {}
+    for name, path in _source_files(source):
+        with open(path, "rb") as f:
+            content = f.read()
+        names[name] = fingerprint(name, content)
+        variants = _compressed_variants(name, content)
+        for output_name in (name, names[name]):
+            output = os.path.join(target, output_name)
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            with open(output, "wb") as f:
+                f.write(content)
+            for suffix, data in variants.items():
+                with open(output + suffix, "wb") as f:
+                    f.write(data)
+    with open(os.path.join(target, MANIFEST_NAME), "w") as f:
+        json.dump(names, f, indent=2, sort_keys=True)
+    return names
+
+
+@dataclass
+class AssetManifest:
+    directory: str
+    names: Dict[str, str]  # original name -> fingerprinted name
+    sources: Dict[str, str] = field(default_factory=dict)  # served name -> file in directory
+    encodings: Dict[str, Tuple[Tuple[str, str], ...]] = field(default_factory=dict)  # file -> variants
+    immutable: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def load(cls) -> "AssetManifest":
+        directory = asset_directory()
+        if directory != STATIC_DIR:
+            with open(os.path.join(directory, MANIFEST_NAME)) as f:
+                names = json.load(f)
+            sources = {name: name for pair in names.items() for name in pair}
+            manifest = cls(directory, names, sources)
+            # Only a build pins content to a name; static/ may still change
+            manifest.immutable = frozenset(names.values())
+        else:
+            names = {}
+            for name, path in _source_files(STATIC_DIR):
+                with open(path, "rb") as f:
+                    names[name] = fingerprint(name, f.read())
+            sources = {**{name: name for name in names}, **{hashed: name for name, hashed in names.items()}}
+            manifest = cls(STATIC_DIR, names, sources)
+        for source in set(manifest.sources.values()):
+            path = os.path.join(manifest.directory, source)
+            manifest.encodings[source] = tuple(
+                (encoding, suffix) for encoding, suffix in ENCODINGS if os.path.exists(path + suffix)
+            )
+        return manifest
+
+    def url(self, name: str) -> str:
+        return "/static/" + self.names.get(name.lstrip("/"), name.lstrip("/"))
+
+
+def asset_directory() -> str:
+    """The build when there is one, else the sources."""
+    if os.path.exists(os.path.join(config.STATIC_BUILD_DIR, MANIFEST_NAME)):
+        return config.STATIC_BUILD_DIR
+    return STATIC_DIR
+
+
+@lru_cache(maxsize=None)
+def manifest() -> AssetManifest:
+    return AssetManifest.load()
+
+
+def _negotiate(scope, encodings: Tuple[Tuple[str, str], ...]) -> Optional[Tuple[str, str]]:
+    if not encodings:
+        return None
+    accept_encoding = ""
+    for key, value in scope["headers"]:
+        if key == b"accept-encoding":
+            accept_encoding = value.decode("latin-1")
+            break
+    for encoding, suffix in encodings:
+        if accepts_encoding(accept_encoding, encoding):
+            return encoding, suffix
+    return None
+
+
+class AssetFiles(StaticFiles):
+    """
+    StaticFiles over the asset manifest: fingerprinted names are cached as
+    immutable, original names are revalidated, and a precompressed variant
+    is sent when the client accepts its encoding.
+    """
+
+    def __init__(self):
+        # The manifest itself is loaded on the first request
+        super().__init__(directory=asset_directory())
+
+    async def get_response(self, path: str, scope) -> Response:
+        assets = manifest()
+        name = path.replace(os.sep, "/")
+        source = assets.sources.get(name)
+        if source is None:
+            return await super().get_response(path, scope)
+
+        variants = assets.encodings.get(source, ())
+        chosen = _negotiate(scope, variants)
+        response = await super().get_response(source + chosen[1] if chosen else source, scope)
+        if chosen and response.status_code == 200:
+            # The Content-Type is already that of the source: mimetypes
+            # reads .gz/.br as encodings
+            response.headers["Content-Encoding"] = chosen[0]
+        if variants:
+            response.headers.add_vary_header("Accept-Encoding")
+        response.headers["Cache-Control"] = IMMUTABLE if name in assets.immutable else REVALIDATE
+        return response
+
+
+@lru_cache(maxsize=None)
+def templates():
+    # Jinja is only needed once a page is requested
+    from fastapi.templating import Jinja2Templates
+
+    jinja = Jinja2Templates(directory=TEMPLATES_DIR)
+    jinja.env.globals["asset"] = lambda name: manifest().url(name)
+    return jinja
+
+
+@dataclass(frozen=True)
+class PageShell:
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+
+@lru_cache(maxsize=None)
+def page_shell(template_name: str) -> PageShell:
+    body = templates().get_template(template_name).render().encode()
+    return PageShell(body, gzip.compress(body, mtime=0), make_etag("page", hashlib.sha256(body).hexdigest()[:16]))
+
+
+def page(request: Request, template_name: str) -> Response:
+    """A page rendered once per process; conditional and gzip-negotiated."""
+    shell = page_shell(template_name)
+    headers = {"ETag": shell.etag, "Cache-Control": REVALIDATE, "Vary": "Accept-Encoding"}
+    if is_not_modified(request, shell.etag):
+        return Response(status_code=304, headers=headers)
+    if accepts_encoding(request.headers.get("accept-encoding", ""), "gzip"):
+        return Response(shell.gzip_body, media_type="text/html", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(shell.body, media_type="text/html", headers=headers)
+
+
+if __name__ == "__main__":
+    built = build()
+    print(f"Built {len(built)} assets into {config.STATIC_BUILD_DIR}"
+          + ("" if brotli is not None else " (gzip only: install brotli for .br variants)"))
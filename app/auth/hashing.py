@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+
+from app import config
+
+
+@lru_cache(maxsize=None)
+def _bcrypt():
+    # Imported on first use: passlib loads its handler registry and bcrypt
+    # backend, which workers that only serve cached tokens never need
+    from passlib.hash import bcrypt
+
+    return bcrypt.using(rounds=config.BCRYPT_ROUNDS)
+
+
+def hash_password(password: str) -> str:
+    return _bcrypt().hash(password)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return _bcrypt().verify(password, hashed_password)
+
+
+class HashingPool:
+    """
+    Runs bcrypt on a dedicated executor so that hashing never blocks the
+    event loop.
+
+    At most `size` hashes run at once and at most `queue_limit` more may
+    wait; beyond that callers get a 503 instead of piling up behind a
+    login storm. bcrypt releases the GIL, so threads scale across cores;
+    the process kind is there for interpreters where that does not hold.
+    """
+
+    def __init__(self, kind: str, size: int, queue_limit: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hash pool kind: {kind!r}")
+        self.kind = kind
+        self.size = size
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.size)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="hashing")
+        return self._executor
+
+    async def run(self, fn: Callable, *args):
+        if self.pending >= self.size + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(config.HASH_POOL_KIND, config.HASH_POOL_SIZE, config.HASH_QUEUE_LIMIT)
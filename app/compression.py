@@ -0,0 +1,106 @@
+"""
+gzip compression of large text responses (JSON, NDJSON, CSV, HTML).
+
+Unlike Starlette's GZipMiddleware it leaves event streams and binary
+types alone, never recompresses a response that already has a
+Content-Encoding (precompressed assets and page shells), and flushes
+every chunk of a streamed response so that exports keep streaming.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Media types worth compressing; text/event-stream is deliberately absent
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/csv",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/javascript",
+})
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """Whether an Accept-Encoding header value allows `encoding` (q > 0)."""
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip() not in (encoding, "*"):
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, level: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not accepts_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), "gzip"
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[dict] = None
+        compressor = None  # set once the response is being compressed
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "").partition(";")[0].strip()
+                if "content-encoding" in headers or media_type not in COMPRESSIBLE_TYPES:
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows the size
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # 31: gzip framing
+                headers["Content-Encoding"] = "gzip"
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                if not more_body:
+                    body = compressor.compress(body) + compressor.flush()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start_message)
+                start_message = None
+
+            if more_body:
+                # Sync flush: the client gets each chunk as it is produced
+                body = compressor.compress(body) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            else:
+                body = compressor.compress(body) + compressor.flush()
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,25 +1,300 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.concurrency import run_in_threadpool
 
-# SQLite connection URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./sql_app.db"
+from app import config
+
+# Database connection URL
+SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
+
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+# A separate read pool only works when every connection opens the same file
+SPLIT_READS = IS_SQLITE and _url.database not in (None, "", ":memory:")
+
+# Session.info key marking a session whose transaction must use the writer
+USE_WRITER = "use_writer"
+
+# Async driver to use for each sync backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if drivername is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()!r}")
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def apply_sqlite_profile(sync_engine, read_only: bool = False) -> None:
+    """
+    Tune every new SQLite connection of `sync_engine`: WAL journaling,
+    relaxed fsync, a larger page cache, memory-mapped reads, enforced
+    foreign keys and a busy timeout so that writers wait for the lock
+    instead of failing.
+
+    Writer connections begin with BEGIN IMMEDIATE. Under WAL a deferred
+    transaction that reads and then writes cannot wait for the write lock;
+    it fails with "database is locked" as soon as another writer commits.
+    """
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy, not the driver, decide when transactions begin
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    @event.listens_for(sync_engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN" if read_only else "BEGIN IMMEDIATE")
+
+
+def server_connect_args(driver: str) -> dict:
+    """
+    Session settings for a PostgreSQL driver: application name, statement
+    timeout and server-side prepared statements.
+    """
+    settings = {"application_name": config.DB_APPLICATION_NAME}
+    if config.DB_STATEMENT_TIMEOUT_MS > 0:
+        settings["statement_timeout"] = str(config.DB_STATEMENT_TIMEOUT_MS)
+    if driver == "asyncpg":
+        # asyncpg prepares every statement and keeps them per connection
+        return {"server_settings": settings, "prepared_statement_cache_size": config.DB_PREPARED_STATEMENT_CACHE_SIZE}
+    if driver not in ("psycopg", "psycopg2"):
+        return {}
+    args = {"application_name": settings.pop("application_name")}
+    if settings:
+        args["options"] = " ".join(f"-c {name}={value}" for name, value in settings.items())
+    if driver == "psycopg":
+        # psycopg 3 prepares a statement once it has run prepare_threshold times
+        args["prepare_threshold"] = config.DB_PREPARE_THRESHOLD if config.DB_PREPARED_STATEMENT_CACHE_SIZE > 0 else None
+    return args
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+
+def _engine_options(url: str, read_only: bool = False, is_async: bool = False) -> dict:
+    if not IS_SQLITE:
+        return {
+            "pool_size": config.DB_POOL_SIZE,
+            "max_overflow": config.DB_MAX_OVERFLOW,
+            "pool_timeout": config.DB_POOL_TIMEOUT,
+            "pool_recycle": config.DB_POOL_RECYCLE,
+            "pool_pre_ping": config.DB_POOL_PRE_PING,
+            "connect_args": server_connect_args(make_url(url).get_driver_name()),
+        }
+    options = {"connect_args": {"check_same_thread": False}}
+    if SPLIT_READS:
+        # aiosqlite defaults to NullPool, which would defeat the sizing below
+        options["poolclass"] = AsyncAdaptedQueuePool if is_async else QueuePool
+    if SPLIT_READS and read_only:
+        options.update(pool_size=config.SQLITE_READ_POOL_SIZE, max_overflow=config.SQLITE_READ_POOL_SIZE)
+    elif SPLIT_READS:
+        # One writer connection: concurrent writers queue on the pool
+        options.update(pool_size=1, max_overflow=0, pool_timeout=config.SQLITE_WRITER_TIMEOUT)
+    return options
+
+
+def _create_engines(factory, url: str):
+    """Create the writer engine and, for SQLite files, the read pool."""
+    is_async = factory is create_async_engine
+    writer = factory(url, **_engine_options(url, is_async=is_async))
+    reader = factory(url, **_engine_options(url, read_only=True, is_async=is_async)) if SPLIT_READS else None
+    if IS_SQLITE:
+        apply_sqlite_profile(getattr(writer, "sync_engine", writer))
+    if reader is not None:
+        apply_sqlite_profile(getattr(reader, "sync_engine", reader), read_only=True)
+    return writer, reader
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to the read pool and flushes/DML to the single writer.
+
+    Once a transaction has written, its later reads use the writer too so
+    that they see their own changes. Raw text() writes are not detected;
+    set `session.info[USE_WRITER] = True` before issuing them.
+    """
+
+    def __init__(self, *args, writer=None, reader=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._writer = writer
+        self._reader = reader
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._writer is None:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if self._reader is None:
+            return self._writer
+        if self._flushing or isinstance(clause, UpdateBase) or self.info.get(USE_WRITER):
+            self.info[USE_WRITER] = True
+            return self._writer
+        return self._reader
+
+
+@event.listens_for(RoutingSession, "after_commit")
+@event.listens_for(RoutingSession, "after_rollback")
+def _release_writer(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop(USE_WRITER, None)
+
+
+# Create SQLAlchemy engine (the writer) and the optional read pool
+engine, read_engine = _create_engines(create_engine, SQLALCHEMY_DATABASE_URL)
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    class_=RoutingSession, writer=engine, reader=read_engine, autocommit=False, autoflush=False
+)
 
 # Create Base class
 Base = declarative_base()
 
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
+if config.DATABASE_ASYNC:
+    async_engine, async_read_engine = _create_engines(create_async_engine, to_async_url(SQLALCHEMY_DATABASE_URL))
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        sync_session_class=RoutingSession,
+        writer=async_engine.sync_engine,
+        reader=async_read_engine.sync_engine if async_read_engine is not None else None,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+else:
+    async_engine = async_read_engine = None
+    AsyncSessionLocal = None
+
+
+class ThreadedResult:
+    """AsyncResult-compatible iteration over a sync Result, fetching in the threadpool."""
+
+    def __init__(self, result):
+        self._result = result
+
+    async def partitions(self, size=None):
+        while True:
+            rows = await run_in_threadpool(self._result.fetchmany, size)
+            if not rows:
+                return
+            yield rows
+
+    async def close(self):
+        await run_in_threadpool(self._result.close)
+
+
+class ThreadedSession:
+    """
+    AsyncSession-compatible facade over a sync Session.
+
+    Every call that may touch the database runs in the threadpool, so route
+    handlers can be written once against the AsyncSession API and work in
+    both the sync and the async engine mode without blocking the event loop.
+    Non-I/O attributes (add, add_all, info, ...) pass through unchanged.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def __getattr__(self, name):
+        return getattr(self.sync_session, name)
+
+    async def execute(self, statement, params=None, execution_options=None, **kwargs):
+        # Buffer ORM rows in the worker thread, as AsyncSession does
+        execution_options = {"prebuffer_rows": True, **(execution_options or {})}
+        return await run_in_threadpool(
+            self.sync_session.execute, statement, params,
+            execution_options=execution_options, **kwargs
+        )
+
+    async def stream(self, statement, params=None, execution_options=None, **kwargs):
+        # Rows stay on the cursor and are fetched a partition at a time
+        execution_options = {"stream_results": True, **(execution_options or {})}
+        result = await run_in_threadpool(
+            self.sync_session.execute, statement, params,
+            execution_options=execution_options, **kwargs
+        )
+        return ThreadedResult(result)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        result = await self.execute(statement, params, **kwargs)
+        return result.scalars()
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self, objects=None):
+        await run_in_threadpool(self.sync_session.flush, objects)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        transaction = await run_in_threadpool(self.sync_session.begin_nested)
+        try:
+            yield transaction
+        except BaseException:
+            await run_in_threadpool(transaction.rollback)
+            raise
+        else:
+            await run_in_threadpool(transaction.commit)
+
+
+@asynccontextmanager
+async def open_session():
+    """A session for the configured mode, for work outside a request."""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    db = ThreadedSession(SessionLocal())
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+
+# Dependency to get DB session
+async def get_db():
+    async with open_session() as db:
+        yield db
@@ -1,22 +1,48 @@
+import time
+
+# Measured before anything else is imported: the import cost of the app
+_import_started = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
-import os
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app import assets, config, metrics
+from app.auth.hashing import hashing_pool
+from app.compression import CompressionMiddleware
+from app.routers import projects, tasks, users, auth, search, stats, transfer
+from app.schema_setup import setup_schema
+from app.services import deadlines, rollups
+from app.write_queue import write_queue
 
-from app.database import engine
-from app.models import project, task, user
+logger = logging.getLogger(__name__)
 
-# Create database tables
-project.Base.metadata.create_all(bind=engine)
-task.Base.metadata.create_all(bind=engine)
-user.Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    await run_in_threadpool(setup_schema, config.SCHEMA_SETUP)
+    metrics.record_startup("schema", time.perf_counter() - started)
+    logger.info("Startup: import %.3fs, schema setup (%s) %.3fs",
+                IMPORT_SECONDS, config.SCHEMA_SETUP, time.perf_counter() - started)
+    rollups.start_compaction()
+    deadlines.scheduler.start()
+    yield
+    await deadlines.scheduler.stop()
+    await rollups.stop_compaction()
+    hashing_pool.shutdown()
+    await write_queue.close()
 
 app = FastAPI(
     title="Project Management API",
     description="API for managing projects, tasks, and team members",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -26,29 +52,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "ETag"],
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# gzip for large API responses; precompressed assets and pages pass through
+if config.COMPRESSION_MIN_BYTES > 0:
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=config.COMPRESSION_MIN_BYTES, level=config.COMPRESSION_LEVEL
+    )
+
+# Request and SQL metrics; added last so that it times the whole stack
+if config.METRICS_ENABLED:
+    metrics.install_sql_hooks()
+    app.add_middleware(metrics.MetricsMiddleware)
 
-# Set up templates
-templates = Jinja2Templates(directory="templates")
+# Fingerprinted, precompressed static assets (see app/assets.py)
+app.mount("/static", assets.AssetFiles(), name="static")
 
+# Pages carry no per-request data (project_detail reads its ID from the
+# URL), so each is rendered once
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return assets.page(request, "login.html")
 
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    return assets.page(request, "dashboard.html")
 
 @app.get("/projects", response_class=HTMLResponse)
-async def projects(request: Request):
-    return templates.TemplateResponse("projects.html", {"request": request})
+async def projects_page(request: Request):
+    return assets.page(request, "projects.html")
 
 @app.get("/project/{project_id}", response_class=HTMLResponse)
 async def project_detail(request: Request, project_id: int):
-    return templates.TemplateResponse("project_detail.html", {"request": request, "project_id": project_id})
+    return assets.page(request, "project_detail.html")
+
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    # e.g. a task referencing a missing project, now that foreign keys are enforced
+    return JSONResponse(status_code=409, content={"detail": f"Conflicts with existing data: {exc.orig}"})
 
 @app.get("/api")
 async def api_root():
@@ -58,13 +100,21 @@ async def api_root():
 async def health_check():
     return {"status": "healthy"}
 
-# Import and include routers
-from app.routers import projects, tasks, users, auth
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
+# Include routers
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
 app.include_router(projects.router, prefix="/projects", tags=["projects"])
 app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 app.include_router(users.router, prefix="/users", tags=["users"])
+app.include_router(search.router, prefix="/search", tags=["search"])
+app.include_router(stats.router, prefix="/stats", tags=["stats"])
+app.include_router(transfer.router, tags=["transfer"])
+
+IMPORT_SECONDS = time.perf_counter() - _import_started
+metrics.record_startup("import", IMPORT_SECONDS)
 
 if __name__ == "__main__":
     import uvicorn
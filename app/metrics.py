@@ -0,0 +1,316 @@
+"""
+Request and SQL instrumentation, exposed in the Prometheus text format.
+
+MetricsMiddleware times every HTTP request by method, route template and
+status. The SQL hooks time every statement and, within a request, count
+its queries and database time, flag N+1 patterns (one SELECT repeated
+N_PLUS_ONE_THRESHOLD times) and log statements slower than SLOW_QUERY_MS
+together with their query plan. Metrics live in process memory, so each
+uvicorn worker reports its own.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import config
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Response appends the charset
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+Labels = Tuple[str, ...]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        # Hooks run in threadpool workers as well as on the event loop
+        self._lock = threading.Lock()
+
+    def _label_text(self, values: Labels, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return super().render() + [f"{self.name}{self._label_text(key)} {_number(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (last one is +Inf), sum]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        lines = super().render()
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                labels = self._label_text(key, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by method, route and status.", ("method", "route", "status"))
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route.", ("method", "route")
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served.", ("method",))
+QUERIES = Counter("db_queries_total", "SQL statements executed, in requests or not.")
+QUERY_DURATION = Histogram("db_query_duration_seconds", "Latency of single SQL statements.")
+REQUEST_QUERIES = Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request.", ("route",), QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram("db_time_per_request_seconds", "Time spent in SQL per HTTP request.", ("route",))
+N_PLUS_ONE = Counter("db_n_plus_one_total", "Requests that repeated one SELECT N_PLUS_ONE_THRESHOLD times.", ("route",))
+SLOW_QUERIES = Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.")
+STARTUP = Gauge(
+    "app_startup_seconds", "Worker startup time by phase: import, schema setup, first request.", ("phase",)
+)
+
+REGISTRY: List[_Metric] = [
+    REQUESTS, REQUEST_DURATION, IN_FLIGHT, QUERIES, QUERY_DURATION,
+    REQUEST_QUERIES, REQUEST_DB_TIME, N_PLUS_ONE, SLOW_QUERIES, STARTUP,
+]
+
+
+def record_startup(phase: str, seconds: float) -> None:
+    STARTUP.set(seconds, (phase,))
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class RequestStats:
+    """SQL work of one request, filled in by the SQL hooks."""
+
+    __slots__ = ("queries", "db_seconds", "selects")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.selects: Dict[str, int] = {}  # SELECT text -> executions
+
+    def repeated_select(self) -> Optional[Tuple[str, int]]:
+        if not self.selects:
+            return None
+        statement, count = max(self.selects.items(), key=lambda item: item[1])
+        return (statement, count) if count >= config.N_PLUS_ONE_THRESHOLD else None
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+def attribute_to(stats: Optional[RequestStats]):
+    """
+    Count the SQL that follows in this context towards `stats`, e.g. work
+    done on behalf of a request in another task; returns the token for
+    reset_attribution().
+    """
+    return _current_stats.set(stats)
+
+
+def reset_attribution(token) -> None:
+    _current_stats.reset(token)
+
+
+_reported_n_plus_one = set()  # (route, statement) pairs already logged
+
+
+def _route_label(scope: dict, root_path: str) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope:
+        # A mounted app, e.g. /static, has no route of its own
+        return scope.get("root_path", "")[len(root_path):] + "/{path}"
+    # Unmatched paths share one label so 404 scans cannot grow the registry
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware, so timing a request costs a few dictionary
+    updates rather than the task and stream BaseHTTPMiddleware adds.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._served = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        IN_FLIGHT.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec((method,))
+            _current_stats.reset(token)
+            route = _route_label(scope, root_path)
+            if not self._served:
+                # Includes the lazy setup that the first request pays for
+                self._served = True
+                record_startup("first_request", elapsed)
+            REQUESTS.inc((method, route, status))
+            REQUEST_DURATION.observe(elapsed, (method, route))
+            REQUEST_QUERIES.observe(stats.queries, (route,))
+            REQUEST_DB_TIME.observe(stats.db_seconds, (route,))
+            repeated = stats.repeated_select()
+            if repeated is not None:
+                N_PLUS_ONE.inc((route,))
+                if (route, repeated[0]) not in _reported_n_plus_one:
+                    _reported_n_plus_one.add((route, repeated[0]))
+                    logger.warning("Possible N+1 in %s %s: %d executions of %s", method, route, repeated[1], repeated[0])
+
+
+# Connection.info key set while a slow statement is being explained
+_EXPLAINING = "metrics_explaining"
+
+_EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+# Statements whose plan is worth logging (not BEGIN, SAVEPOINT, INSERT ... VALUES)
+_EXPLAINED = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which a failed statement just drops
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    if conn.info.get(_EXPLAINING):
+        return
+    QUERIES.inc()
+    QUERY_DURATION.observe(elapsed)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        if statement.lstrip()[:6].upper() == "SELECT":
+            stats.selects[statement] = stats.selects.get(statement, 0) + 1
+    if elapsed * 1000 >= config.SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        _log_slow_query(conn, statement, parameters, executemany, elapsed)
+
+
+def _log_slow_query(conn, statement, parameters, executemany, elapsed) -> None:
+    plan = None
+    prefix = _EXPLAIN_PREFIXES.get(conn.dialect.name)
+    # The plan of one executemany row is not the plan of the batch
+    explain = prefix and not executemany and statement.lstrip().upper().startswith(_EXPLAINED)
+    if config.SLOW_QUERY_EXPLAIN and explain:
+        conn.info[_EXPLAINING] = True
+        try:
+            rows = conn.exec_driver_sql(prefix + statement, parameters).all()
+            plan = "\n".join(" ".join(str(value) for value in row) for row in rows)
+        except Exception as exc:  # e.g. a statement the database cannot explain
+            plan = f"unavailable: {exc}"
+        finally:
+            conn.info[_EXPLAINING] = False
+    slow_query_logger.warning(
+        "Slow query (%.1f ms): %s\nParameters: %.500r%s",
+        elapsed * 1000, statement, parameters, f"\nPlan:\n{plan}" if plan else "",
+    )
+
+
+def install_sql_hooks() -> None:
+    """Time the statements of every engine (sync, and async via sync_engine)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,3 +1,7 @@
 from app.models.user import User
 from app.models.project import Project
 from app.models.task import Task
+from app.models.counter import Counter
+from app.models.tag import Tag, ProjectTag
+from app.models import search
+from app.models.rollup import ProjectTaskCount, TaskEvent, ProjectDailySnapshot
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String
+
+from app.database import Base
+
+
+class Counter(Base):
+    """
+    Named running total, e.g. "tasks.total" or "tasks.status.done".
+
+    Rows are adjusted in the same transaction as the write they describe,
+    so reading them is always O(1) regardless of table size.
+    """
+    __tablename__ = "counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
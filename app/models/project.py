@@ -19,6 +19,8 @@ class Project(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    # passive_deletes: deleting a project never loads its tasks; the
+    # database (or app/services/project_deletion.py) removes them
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
     owner_id = Column(Integer, ForeignKey("users.id"))
     owner = relationship("User", back_populates="projects")
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, String
+
+from app.database import Base
+
+
+class ProjectTaskCount(Base):
+    """
+    Running task count of one project, named like the global counters:
+    "total" or "status.<status>" (see app/services/rollups.py).
+
+    Adjusted in the same transaction as the task write it describes, so a
+    page of projects gets its progress from one index range per project.
+    """
+    __tablename__ = "project_task_counts"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class TaskEvent(Base):
+    """
+    Append-only record of a task entering, leaving or changing status
+    within a project. A move between projects is a "moved_out" event in
+    the old project and a "moved_in" event in the new one.
+    """
+    __tablename__ = "task_events"
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    task_id = Column(Integer, nullable=False)  # kept after the task is deleted
+    kind = Column(String, nullable=False)  # created, changed, deleted, moved_in, moved_out
+    from_status = Column(String, nullable=True)
+    to_status = Column(String, nullable=True)
+    occurred_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Deleting a project's history
+        Index("ix_task_events_project_id_id", "project_id", "id"),
+        # Pruning compacted events past their retention
+        Index("ix_task_events_occurred_at", "occurred_at"),
+    )
+
+
+class ProjectDailySnapshot(Base):
+    """
+    End-of-day value of a project task count, built from task_events by
+    the compaction job, with the number of tasks that changed into the
+    status that day (`entered`). Days without events have no row: the
+    previous row still holds.
+    """
+    __tablename__ = "project_daily_snapshots"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    entered = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,123 @@
+from sqlalchemy import DDL, event
+
+from app.models.project import Project
+from app.models.task import Task
+
+
+# SQLite FTS5 indexes over projects and tasks. Both are external-content
+# tables, so the text lives only in the base tables and the triggers keep the
+# index in sync with every insert, update and delete in the same transaction.
+PROJECTS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+        name, description, status, tags,
+        content='projects', content_rowid='id',
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, name, description, status, tags)
+        VALUES (new.id, new.name, new.description, new.status, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, description, status, tags)
+        VALUES ('delete', old.id, old.name, old.description, old.status, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_au
+    AFTER UPDATE OF name, description, status, tags ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, description, status, tags)
+        VALUES ('delete', old.id, old.name, old.description, old.status, old.tags);
+        INSERT INTO projects_fts(rowid, name, description, status, tags)
+        VALUES (new.id, new.name, new.description, new.status, new.tags);
+    END
+    """,
+]
+
+TASKS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, status,
+        content='tasks', content_rowid='id',
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description, status)
+        VALUES (new.id, new.title, new.description, new.status);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description, status)
+        VALUES ('delete', old.id, old.title, old.description, old.status);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_au
+    AFTER UPDATE OF title, description, status ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description, status)
+        VALUES ('delete', old.id, old.title, old.description, old.status);
+        INSERT INTO tasks_fts(rowid, title, description, status)
+        VALUES (new.id, new.title, new.description, new.status);
+    END
+    """,
+]
+
+
+# PostgreSQL: weighted tsvector expressions behind GIN indexes, for the same
+# word-prefix search, and pg_trgm indexes on names and titles for the
+# typo-tolerant fallback (see app/services/search.py), skipped where the
+# server lacks the extension. Queries must repeat the indexed expressions
+# exactly.
+PROJECTS_TSVECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(tags, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(status, '')), 'D')"
+)
+TASKS_TSVECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(status, '')), 'D')"
+)
+
+
+def _trigram_index_ddl(name: str, table: str, column: str) -> str:
+    return f"""
+    DO $$ BEGIN
+        IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops);
+        END IF;
+    END $$
+    """
+
+
+PROJECTS_PG_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_projects_search ON projects USING gin (({PROJECTS_TSVECTOR}))",
+    _trigram_index_ddl("ix_projects_name_trgm", "projects", "name"),
+]
+
+TASKS_PG_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING gin (({TASKS_TSVECTOR}))",
+    _trigram_index_ddl("ix_tasks_title_trgm", "tasks", "title"),
+]
+
+
+for statement in PROJECTS_FTS_DDL:
+    event.listen(Project.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+for statement in TASKS_FTS_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+for statement in PROJECTS_PG_SEARCH_DDL:
+    event.listen(Project.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+for statement in TASKS_PG_SEARCH_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
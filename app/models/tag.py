@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+
+from app.database import Base
+
+
+class Tag(Base):
+    """A distinct, normalized project tag (see app/services/tags.py)."""
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class ProjectTag(Base):
+    """
+    Link between a project and one of its tags, derived from the
+    comma-separated `Project.tags` column whenever a project is written.
+    """
+    __tablename__ = "project_tags"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        # Tag filters and facets: the projects of a tag in ID order
+        Index("ix_project_tags_tag_project", "tag_id", "project_id"),
+    )
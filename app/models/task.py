@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -18,8 +18,21 @@ class Task(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"))
     project = relationship("Project", back_populates="tasks")
     
     assigned_to_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     assigned_to = relationship("User", back_populates="assigned_tasks")
+
+    __table_args__ = (
+        # Keyset pagination of a project's tasks: WHERE project_id = ? AND id > ? ORDER BY id
+        Index("ix_tasks_project_id_id", "project_id", "id"),
+        # Kanban board: one range scan per (column, priority) segment
+        Index("ix_tasks_project_status_priority", "project_id", "status", "priority", "id"),
+        # Work queues: a user's tasks of one status ordered by due date
+        Index("ix_tasks_assignee_status_due", "assigned_to_id", "status", "due_date", "id"),
+        # Due date ranges and ordering across all tasks
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+        # Overdue counts of a page of projects (app/services/rollups.py)
+        Index("ix_tasks_project_due_status", "project_id", "due_date", "status"),
+    )
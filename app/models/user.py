@@ -1,7 +1,6 @@
 from sqlalchemy import Column, Integer, String, Boolean
 from sqlalchemy.orm import relationship
-from passlib.hash import bcrypt
-
+from app.auth import hashing
 from app.database import Base
 
 
@@ -20,9 +19,11 @@ class User(Base):
     projects = relationship("Project", back_populates="owner")
     assigned_tasks = relationship("Task", back_populates="assigned_to")
 
+    # These hash on the calling thread; request handlers should await
+    # app.auth.hashing.hashing_pool instead so the event loop is not blocked.
     def verify_password(self, password):
-        return bcrypt.verify(password, self.hashed_password)
+        return hashing.verify_password(password, self.hashed_password)
     
     @classmethod
     def hash_password(cls, password):
-        return bcrypt.hash(password)
+        return hashing.hash_password(password)
@@ -3,8 +3,11 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.cache import Principal
+from app.auth.hashing import hashing_pool
 from app.auth.token import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token, get_current_active_user
 from app.database import get_db
 from app.models.user import User
@@ -17,10 +20,10 @@ router = APIRouter()
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not user.verify_password(form_data.password):
+    user = await db.scalar(select(User).where(User.username == form_data.username))
+    if not user or not await hashing_pool.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -37,6 +40,6 @@ async def login_for_access_token(
 
 @router.get("/users/me", response_model=UserSchema)
 async def read_users_me(
-    current_user: Annotated[User, Depends(get_current_active_user)]
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
 ):
     return current_user
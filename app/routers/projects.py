@@ -1,42 +1,117 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from datetime import datetime
+from typing import List, Literal, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth.token import get_current_active_user
-from app.database import get_db
+from app.auth.token import get_current_active_user, get_stream_user
+from app.database import get_db, open_session
 from app.models.project import Project
 from app.models.user import User
+from app.schemas.board import Board
 from app.schemas.project import Project as ProjectSchema
-from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.schemas.project import (
+    Burndown, ProjectCreate, ProjectProgress, ProjectSummary, ProjectUpdate, ProjectWithProgress, TagCount,
+)
+from app.services import board as board_service
+from app.services import conditional, counters, events, fast_json, project_deletion, rollups, tags, writes
+from app.services.events import change_feed
+from app.services.fieldsets import Fieldset
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_cursor, set_page_headers, split_page
+from app.services.versions import collection_version
 
 router = APIRouter()
 
+# Fields of the list endpoint: a summary unless `fields` asks for others
+PROJECT_FIELDS = Fieldset.of(Project, ProjectWithProgress, ProjectSummary, computed=["progress"])
 
-@router.get("/", response_model=List[ProjectSchema])
+
+@router.get("/", response_model=List[ProjectSummary])
 async def get_projects(
+    request: Request,
+    cursor: Optional[str] = None,
     skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), 
+    tag: List[str] = Query([]),
+    tag_match: tags.TagMatch = "all",
+    fields: List[str] = Query([]),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Retrieve all projects, ordered by ID.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` to get the
+    next page. `skip` is kept for older clients but degrades on deep pages.
+    The ETag changes with every write to projects or tasks and whenever
+    a due date passes.
+
+    Every project comes with its `progress`: task counts by status,
+    percent done and the number of overdue tasks, read from rollups kept
+    up to date by every task write.
+
+    Repeat `tag` (or give a comma-separated list) to keep only projects
+    carrying all of the tags, or any of them with `tag_match=any`.
+    Tags match case-insensitively.
+
+    Projects come without their description unless `fields` asks for
+    it: give a comma-separated list (or repeat the parameter) of the
+    fields to return, or `fields=all`. Only those columns are read, and
+    progress only when it is one of them.
+    """
+    selected = PROJECT_FIELDS.select(fields)
+    etag = conditional.make_etag(
+        "projects", PROJECT_FIELDS.tag(selected),
+        await collection_version(db, "projects"), await collection_version(db, "tasks"),
+        conditional.stamp(await rollups.next_due(db)),
+    )
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+
+    query = tags.filter_projects(select(*PROJECT_FIELDS.columns(selected)), tag, tag_match)
+    query = apply_cursor(query, Project.id, cursor, limit, skip)
+    rows, next_cursor = split_page((await db.execute(query)).all(), limit)
+    if "progress" in selected:
+        progress = await rollups.load_progress(db, [row.id for row in rows])
+        response = fast_json.rows_response(rows, selected, progress=lambda row: progress[row.id])
+    else:
+        response = fast_json.rows_response(rows, selected)
+    set_page_headers(request, response, next_cursor)
+    conditional.set_validators(response, etag)
+    return response
+
+
+@router.get("/tags", response_model=List[TagCount])
+async def get_project_tags(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Retrieve all projects.
+    Tag facets: every tag in use with its number of projects, most used
+    first. Counted from the tag index, not by splitting tags strings.
     """
-    projects = db.query(Project).offset(skip).limit(limit).all()
-    return projects
+    etag = conditional.make_etag("project-tags", await collection_version(db, "projects"))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+    response = fast_json.rows_response(await tags.tag_counts(db, limit))
+    conditional.set_validators(response, etag)
+    return response
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=ProjectSchema)
 async def create_project(
     project_data: ProjectCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Create a new project.
     """
     # Use the current user's ID as the owner_id
-    db_project = Project(
+    db_project = await writes.insert_returning(db, Project, dict(
         name=project_data.name,
         description=project_data.description,
         status=project_data.status,
@@ -44,64 +119,194 @@ async def create_project(
         end_date=project_data.end_date,
         tags=project_data.tags,
         owner_id=current_user.id
-    )
-    db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    ))
+    if db_project.tags:
+        await db.run_sync(tags.sync_project_tags, {db_project.id: db_project.tags})
+    counters.record_created(db, "projects", db_project.status)
+    await db.commit()
     return db_project
 
 
-@router.get("/{project_id}", response_model=ProjectSchema)
+@router.get("/{project_id}", response_model=ProjectWithProgress)
 async def get_project(
     project_id: int, 
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Retrieve a specific project by ID.
+    Retrieve a specific project by ID, with its `progress`.
+
+    Validated by an ETag over `updated_at`, the tasks version and the
+    project's next due date: a matching If-None-Match gets a 304 without
+    the project being loaded. There is no Last-Modified, since progress
+    changes without `updated_at` changing.
     """
-    db_project = db.query(Project).filter(Project.id == project_id).first()
+    row = (await db.execute(select(Project.updated_at).where(Project.id == project_id))).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    etag = conditional.make_etag(
+        "project", project_id, conditional.stamp(row.updated_at),
+        await collection_version(db, "tasks"),
+        conditional.stamp(await rollups.next_due(db, project_id)),
+    )
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+
+    db_project = await db.get(Project, project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return db_project
+    conditional.set_validators(response, etag)
+    project = ProjectWithProgress.model_validate(db_project)
+    project.progress = ProjectProgress(**(await rollups.load_progress(db, [project_id]))[project_id])
+    return project
 
 
 @router.put("/{project_id}", response_model=ProjectSchema)
 async def update_project(
     project_id: int, 
     project_data: ProjectUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Update a specific project.
     """
-    db_project = db.query(Project).filter(Project.id == project_id).first()
-    if db_project is None:
+    update_data = project_data.model_dump(exclude_unset=True)
+    updated = await writes.update_returning(db, Project, project_id, update_data, previous=["status"])
+    if updated is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    update_data = project_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_project, key, value)
+    db_project, old = updated
+    if "tags" in update_data:
+        await db.run_sync(tags.sync_project_tags, {project_id: db_project.tags})
+    counters.record_status_change(db, "projects", old["status"], db_project.status)
     
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    change_feed.publish(project_id, "project.updated", events.changed_fields(db_project, update_data))
     return db_project
 
 
-@router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{project_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={status.HTTP_202_ACCEPTED: {"description": "Deletion started in the background"}},
+)
 async def delete_project(
     project_id: int, 
-    db: Session = Depends(get_db),
+    background: bool = False,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Delete a specific project.
+    Delete a specific project together with its tasks.
+
+    With `background=true` the request returns 202 right away and the
+    tasks are deleted in chunks, each its own short transaction, so a
+    very large project does not hold the write lock for seconds. The
+    project disappears, and `project.deleted` is published, once its
+    last chunk is gone.
     """
-    db_project = db.query(Project).filter(Project.id == project_id).first()
-    if db_project is None:
+    if background:
+        if await db.scalar(select(Project.id).where(Project.id == project_id)) is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        project_deletion.start_background_delete(project_id)
+        return JSONResponse({"id": project_id, "status": "deleting"}, status_code=status.HTTP_202_ACCEPTED)
+
+    if not await project_deletion.delete_project_rows(db, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    db.delete(db_project)
-    db.commit()
-    return None
\ No newline at end of file
+    await db.commit()
+    change_feed.publish(project_id, "project.deleted", {"id": project_id})
+    return None
+
+
+@router.get("/{project_id}/board", response_model=Board)
+async def get_project_board(
+    project_id: int,
+    request: Request,
+    response: Response,
+    column: Optional[Literal[board_service.BOARD_COLUMNS]] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Kanban board of a project: tasks grouped by status column, ordered by
+    priority (high to low) then ID, with a total count per column.
+
+    Every column returns at most `limit` tasks. To load more of one column
+    pass its `next_cursor` as `cursor` together with `column`.
+    """
+    if cursor and column is None:
+        raise HTTPException(status_code=400, detail="cursor requires column")
+    etag = conditional.make_etag(
+        "board", project_id,
+        await collection_version(db, "projects"), await collection_version(db, "tasks"),
+    )
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+    if await db.get(Project, project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    columns = (column,) if column else board_service.BOARD_COLUMNS
+    conditional.set_validators(response, etag)
+    return Board(
+        project_id=project_id,
+        columns=await board_service.load_board(db, project_id, limit, columns, cursor),
+    )
+
+
+@router.get("/{project_id}/burndown", response_model=Burndown)
+async def get_project_burndown(
+    project_id: int,
+    request: Request,
+    response: Response,
+    days: int = Query(30, ge=1, le=366),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Daily burndown and velocity of a project over the last `days` days
+    (UTC), oldest first: task counts at the end of each day, the tasks
+    remaining (not done) and how many were completed that day.
+
+    Read from daily snapshots built by the compaction job, not from the
+    task history; today's counts are live.
+    """
+    etag = conditional.make_etag(
+        "burndown", project_id, days, datetime.utcnow().date(),
+        await collection_version(db, "tasks"), await rollups.compacted_through(db),
+    )
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+    if await db.scalar(select(Project.id).where(Project.id == project_id)) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    conditional.set_validators(response, etag)
+    return Burndown(project_id=project_id, days=await rollups.load_burndown(db, project_id, days))
+
+
+@router.get("/{project_id}/events")
+async def get_project_events(
+    project_id: int,
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(get_stream_user)
+):
+    """
+    Server-sent events with the changes to a project and its tasks:
+    `task.created` (full task), `task.updated` (ID, updated_at and the
+    changed fields), `task.deleted`, `project.updated`, `project.deleted`,
+    and `reset` when the client missed events and must refetch the board.
+
+    EventSource reconnects with Last-Event-ID and resumes from there. Pass
+    the token as `?access_token=` since EventSource cannot send headers.
+    """
+    async with open_session() as db:
+        if await db.get(Project, project_id) is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+    return StreamingResponse(
+        events.event_stream(project_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
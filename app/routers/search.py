@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Literal, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.token import get_current_active_user
+from app.database import get_db
+from app.models.user import User
+from app.schemas.search import SearchResults
+from app.services import search
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResults)
+async def search_all(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[Literal["project", "task"]] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Full-text search over projects and tasks.
+
+    Each word is prefix-matched and results are ranked by relevance.
+    `limit` applies per result type.
+    """
+    projects = await search.search_projects(db, q, limit) if type in (None, "project") else []
+    tasks = await search.search_tasks(db, q, limit) if type in (None, "task") else []
+    return SearchResults(query=q, projects=projects, tasks=tasks)
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.cache import principal_cache
+from app.auth.token import get_current_active_user
+from app.database import get_db
+from app.models.user import User
+from app.schemas.stats import AuthCacheStats, ChangeFeedStats, DeadlineSchedulerStats, StatsSummary
+from app.services import counters
+from app.services.deadlines import scheduler
+from app.services.events import change_feed
+
+router = APIRouter()
+
+
+@router.get("/summary", response_model=StatsSummary)
+async def get_summary(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Total and per-status counts for projects and tasks, and the user count.
+
+    Served from counters maintained on every write, not from COUNT(*) scans.
+    """
+    summary = await counters.summarize(db)
+    return StatsSummary(
+        projects=summary.get("projects", {}),
+        tasks=summary.get("tasks", {}),
+        users={"total": summary.get("users", {}).get("total", 0)},
+    )
+
+
+@router.get("/auth-cache", response_model=AuthCacheStats)
+async def get_auth_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Hit/miss counters of the authenticated-principal cache. Every hit is a
+    user lookup that did not reach the database.
+    """
+    return principal_cache.stats()
+
+
+@router.get("/events", response_model=ChangeFeedStats)
+async def get_change_feed_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    State of this process's project change feed: events published and
+    buffered for resume, and connected subscribers.
+    """
+    return change_feed.stats()
+
+
+@router.get("/deadlines", response_model=DeadlineSchedulerStats)
+async def get_deadline_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    State of this process's deadline scheduler: the window of deadlines
+    it holds, when it was last read and the events published.
+    """
+    return scheduler.stats()
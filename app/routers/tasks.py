@@ -1,64 +1,249 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Body, Depends, Query, Request, Response
+from datetime import datetime, timedelta
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import config
 from app.auth.token import get_current_active_user
 from app.database import get_db
 from app.models.task import Task
 from app.models.user import User
 from app.schemas.task import Task as TaskSchema
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.task import (
+    MAX_BATCH_ITEMS, TaskBatch, TaskBatchResult, TaskBatchUpdate, TaskCreate, TaskSummary, TaskUpdate,
+)
+from app.services import (
+    conditional, counters, deadlines, events, fast_json, rollups, task_batch, task_queries, writes,
+)
+from app.services.fieldsets import Fieldset
+from app.services.events import change_feed
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_page_headers
+from app.services.versions import collection_version
 
 router = APIRouter()
 
+# Fields of the list endpoints: a summary unless `fields` asks for others
+TASK_FIELDS = Fieldset.of(Task, TaskSchema, TaskSummary)
 
-@router.get("/", response_model=List[TaskSchema])
+
+@router.get("/", response_model=List[TaskSummary])
 async def get_tasks(
+    request: Request,
     project_id: Optional[int] = None,
+    assigned_to_id: Optional[int] = None,
+    status: List[str] = Query([]),
+    priority: List[str] = Query([]),
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    sort: task_queries.TaskSort = "id",
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: List[str] = Query([]),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Retrieve all tasks, optionally filtered by project_id.
+    Retrieve all tasks, optionally filtered by project, assignee, status
+    and priority (both repeatable) and a due date range (`due_after`
+    inclusive, `due_before` exclusive).
+
+    `sort=id` (default) or `sort=due_date`, earliest first with undated
+    tasks last. Pass the `X-Next-Cursor` response header back as `cursor`
+    to get the next page. `skip` is kept for older clients but degrades
+    on deep pages. The ETag changes with every write to tasks.
+
+    Tasks come without their description unless `fields` asks for it:
+    give a comma-separated list (or repeat the parameter) of the fields
+    to return, or `fields=all`. Only those columns are read.
     """
-    query = db.query(Task)
-    if project_id:
-        query = query.filter(Task.project_id == project_id)
-    
-    tasks = query.offset(skip).limit(limit).all()
-    return tasks
+    selected = TASK_FIELDS.select(fields)
+    etag = conditional.make_etag("tasks", TASK_FIELDS.tag(selected), await collection_version(db, "tasks"))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+
+    filters = task_queries.TaskFilters(
+        project_id=project_id, assigned_to_id=assigned_to_id, statuses=status,
+        priorities=priority, due_after=due_after, due_before=due_before,
+    )
+    columns = TASK_FIELDS.columns(selected, *task_queries.SORT_KEYS[sort])
+    rows, next_cursor = await task_queries.load_page(db, columns, filters, sort, limit, cursor, skip)
+    response = fast_json.rows_response(rows, selected)
+    set_page_headers(request, response, next_cursor)
+    conditional.set_validators(response, etag)
+    return response
+
+
+@router.get("/mine", response_model=List[TaskSummary])
+async def get_my_tasks(
+    request: Request,
+    project_id: Optional[int] = None,
+    status: List[str] = Query(list(task_queries.OPEN_STATUSES)),
+    priority: List[str] = Query([]),
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    sort: task_queries.TaskSort = "due_date",
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: List[str] = Query([]),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    The current user's work queue: tasks assigned to them that are still
+    open (todo and in_progress unless `status` says otherwise), soonest
+    due first. Takes the filters, paging and `fields` of `GET /tasks`;
+    each status is a range scan of ix_tasks_assignee_status_due.
+    """
+    selected = TASK_FIELDS.select(fields)
+    etag = conditional.make_etag(
+        "tasks-mine", current_user.id, TASK_FIELDS.tag(selected), await collection_version(db, "tasks")
+    )
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+
+    filters = task_queries.TaskFilters(
+        project_id=project_id, assigned_to_id=current_user.id, statuses=status,
+        priorities=priority, due_after=due_after, due_before=due_before,
+    )
+    columns = TASK_FIELDS.columns(selected, *task_queries.SORT_KEYS[sort])
+    rows, next_cursor = await task_queries.load_page(db, columns, filters, sort, limit, cursor)
+    response = fast_json.rows_response(rows, selected)
+    set_page_headers(request, response, next_cursor)
+    conditional.set_validators(response, etag)
+    return response
+
+
+@router.get("/due-soon", response_model=List[TaskSummary])
+async def get_due_soon_tasks(
+    request: Request,
+    hours: int = Query(config.DEADLINE_DUE_SOON_HOURS, ge=1, le=config.DEADLINE_HORIZON_HOURS),
+    project_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: List[str] = Query([]),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Open tasks (not done) due within the next `hours`, soonest first,
+    optionally of one project. Takes the paging and `fields` of
+    `GET /tasks`.
+
+    Read from the deadline scheduler's in-memory window, with the rows
+    loaded by primary key; nothing scans the tasks table.
+    """
+    selected = TASK_FIELDS.select(fields)
+    now = datetime.utcnow()
+    rows, next_cursor = await deadlines.load_feed(
+        db, TASK_FIELDS.columns(selected, "due_date", "id"), now, now + timedelta(hours=hours),
+        limit, cursor, project_id=project_id,
+    )
+    response = fast_json.rows_response(rows, selected)
+    set_page_headers(request, response, next_cursor)
+    return response
+
+
+@router.get("/overdue", response_model=List[TaskSummary])
+async def get_overdue_tasks(
+    request: Request,
+    project_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: List[str] = Query([]),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Open tasks whose due date has passed, most recently due first,
+    optionally of one project: the tasks project `progress` counts as
+    overdue. Takes the paging and `fields` of `GET /tasks`.
+
+    A keyset scan of the due date index back from now.
+    """
+    selected = TASK_FIELDS.select(fields)
+    rows, next_cursor = await deadlines.load_feed(
+        db, TASK_FIELDS.columns(selected, "due_date", "id"), None, datetime.utcnow(),
+        limit, cursor, descending=True, project_id=project_id,
+    )
+    response = fast_json.rows_response(rows, selected)
+    set_page_headers(request, response, next_cursor)
+    return response
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=TaskSchema)
 async def create_task(
     task_data: TaskCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Create a new task.
     """
-    db_task = Task(**task_data.model_dump())
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    db_task = await writes.insert_returning(db, Task, task_data.model_dump())
+    counters.record_created(db, "tasks", db_task.status)
+    rollups.record_task_created(db, db_task.id, db_task.project_id, db_task.status)
+    deadlines.record_task(db, db_task.id, db_task.project_id, db_task.due_date, db_task.status)
+    await db.commit()
+    change_feed.publish(db_task.project_id, "task.created", TaskSchema.model_validate(db_task))
     return db_task
 
 
+@router.post("/batch", response_model=TaskBatchResult)
+async def batch_tasks(
+    batch: TaskBatch,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create, update and delete many tasks in one transaction.
+
+    Returns one result per item; unknown IDs are reported as failed items
+    instead of failing the whole batch.
+    """
+    return TaskBatchResult(results=await task_batch.apply_batch(db, batch))
+
+
+@router.patch("/batch", response_model=TaskBatchResult)
+async def batch_update_tasks(
+    updates: List[TaskBatchUpdate] = Body(..., max_length=MAX_BATCH_ITEMS),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Partially update many tasks at once, e.g. after Kanban moves.
+    Shorthand for `POST /tasks/batch` with only `update` items.
+    """
+    return TaskBatchResult(results=await task_batch.apply_batch(db, TaskBatch(update=updates)))
+
+
 @router.get("/{task_id}", response_model=TaskSchema)
 async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Retrieve a specific task by ID.
+
+    Validated by `updated_at`: a matching If-None-Match/If-Modified-Since
+    gets a 304 without the task being loaded.
     """
-    db_task = db.query(Task).filter(Task.id == task_id).first()
+    row = (await db.execute(select(Task.updated_at).where(Task.id == task_id))).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    updated_at = row.updated_at
+    etag = conditional.item_etag("task", task_id, updated_at)
+    if conditional.is_not_modified(request, etag, updated_at):
+        return conditional.not_modified(etag, updated_at)
+
+    db_task = await db.get(Task, task_id)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    conditional.set_validators(response, etag, updated_at)
     return db_task
 
 
@@ -66,38 +251,55 @@ async def get_task(
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Update a specific task.
     """
-    db_task = db.query(Task).filter(Task.id == task_id).first()
-    if db_task is None:
+    update_data = task_data.model_dump(exclude_unset=True)
+    updated = await writes.update_returning(db, Task, task_id, update_data, previous=["status", "project_id"])
+    if updated is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    update_data = task_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_task, key, value)
+    db_task, old = updated
+    old_status = old["status"]
+    old_project_id = old["project_id"]
+    counters.record_status_change(db, "tasks", old_status, db_task.status)
+    rollups.record_task_changed(db, task_id, old_project_id, old_status, db_task.project_id, db_task.status)
+    deadlines.record_task(db, task_id, db_task.project_id, db_task.due_date, db_task.status)
     
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    if db_task.project_id != old_project_id:
+        change_feed.publish(old_project_id, "task.deleted", {"id": task_id})
+        change_feed.publish(db_task.project_id, "task.created", TaskSchema.model_validate(db_task))
+    else:
+        change_feed.publish(db_task.project_id, "task.updated", events.changed_fields(db_task, update_data))
     return db_task
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Delete a specific task.
     """
-    db_task = db.query(Task).filter(Task.id == task_id).first()
-    if db_task is None:
+    # Counted from what the DELETE removed, so that concurrent deletes of
+    # one task count it down once and all but the first get a 404
+    deleted = (await db.execute(
+        delete(Task).where(Task.id == task_id).returning(Task.project_id, Task.status),
+        execution_options=writes.UPDATE_OPTIONS,
+    )).first()
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    db.delete(db_task)
-    db.commit()
+    project_id = deleted.project_id
+    counters.record_deleted(db, "tasks", deleted.status)
+    rollups.record_task_deleted(db, task_id, project_id, deleted.status)
+    deadlines.record_task_deleted(db, task_id)
+    await db.commit()
+    change_feed.publish(project_id, "task.deleted", {"id": task_id})
     return None
\ No newline at end of file
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import Literal
+
+from app import config
+from app.auth.token import get_stream_user
+from app.models.user import User
+from app.schemas.transfer import ImportResult
+from app.services import transfer
+
+router = APIRouter()
+
+Entity = Literal["projects", "tasks"]
+Format = Literal["ndjson", "csv"]
+
+
+@router.get("/export/{entity}")
+async def export_entity(
+    entity: Entity,
+    format: Format = "ndjson",
+    current_user: User = Depends(get_stream_user)
+):
+    """
+    Stream every project or task as NDJSON (one object per line) or CSV
+    with a header line. Memory use does not grow with the table size.
+    """
+    return StreamingResponse(
+        transfer.export_rows(entity, format, config.EXPORT_CHUNK_ROWS),
+        media_type=transfer.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{format}"'},
+    )
+
+
+@router.post("/import/{entity}", response_model=ImportResult)
+async def import_entity(
+    request: Request,
+    entity: Entity,
+    format: Format = "ndjson",
+    keep_ids: bool = False,
+    current_user: User = Depends(get_stream_user)
+):
+    """
+    Import projects or tasks from an NDJSON or CSV request body, in the
+    shape produced by the export endpoints.
+
+    The body is parsed as it arrives and written in batched transactions.
+    By default `id`, `created_at` and `updated_at` are assigned anew and
+    imported projects are owned by the caller; `keep_ids=true` keeps them
+    from the file. An invalid record stops the import with a 422 that
+    reports its line and how many rows were already committed.
+    """
+    try:
+        return await transfer.import_records(
+            entity,
+            transfer.iter_records(request.stream(), format),
+            keep_ids=keep_ids,
+            owner_id=current_user.id,
+            batch_rows=config.IMPORT_BATCH_ROWS,
+        )
+    except transfer.ImportFailed as exc:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": exc.message, "line": exc.line, "imported": exc.imported},
+        )
@@ -1,79 +1,112 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from typing import List, Optional
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.cache import principal_cache
+from app.auth.hashing import hashing_pool
 from app.database import get_db
+from app.models.project import Project
+from app.models.task import Task
 from app.models.user import User
 from app.schemas.user import User as UserSchema
 from app.schemas.user import UserCreate, UserUpdate
+from app.services import conditional, counters, fast_json, writes
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_cursor, set_page_headers, split_page
+from app.services.versions import collection_version
 
 router = APIRouter()
 
+# Columns selected by the list endpoint, in response field order
+USER_COLUMNS = fast_json.schema_columns(User, UserSchema)
+
 
 @router.get("/", response_model=List[UserSchema])
 async def get_users(
+    request: Request,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Retrieve all users.
+    Retrieve all users, ordered by ID.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` to get the
+    next page. `skip` is kept for older clients but degrades on deep pages.
+    The ETag changes with every write to users.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    etag = conditional.make_etag("users", await collection_version(db, "users"))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+
+    query = apply_cursor(select(*USER_COLUMNS), User.id, cursor, limit, skip)
+    rows, next_cursor = split_page((await db.execute(query)).all(), limit)
+    response = fast_json.rows_response(rows)
+    set_page_headers(request, response, next_cursor)
+    conditional.set_validators(response, etag)
+    return response
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=UserSchema)
 async def create_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new user.
+
+    The INSERT skips rows that clash with an existing email or username,
+    so a new user is a single statement; only a clash reads which it was.
     """
-    # Check if user with this email already exists
-    db_user = db.query(User).filter(User.email == user_data.email).first()
-    if db_user:
-        raise HTTPException(
-            status_code=400,
-            detail="Email already registered"
-        )
-    
-    # Check if username is taken
-    db_user = db.query(User).filter(User.username == user_data.username).first()
-    if db_user:
-        raise HTTPException(
-            status_code=400,
-            detail="Username already taken"
-        )
-    
-    # Create new user
-    hashed_password = User.hash_password(user_data.password)
-    db_user = User(
+    hashed_password = await hashing_pool.hash(user_data.password)
+    db_user = await writes.insert_returning(db, User, dict(
         username=user_data.username,
         email=user_data.email,
         full_name=user_data.full_name,
         role=user_data.role,
         hashed_password=hashed_password
-    )
+    ), skip_conflicts=True)
+    if db_user is None:
+        taken = await db.scalars(
+            select(User.email).where(or_(User.email == user_data.email, User.username == user_data.username))
+        )
+        if user_data.email in taken.all():
+            raise HTTPException(
+                status_code=400,
+                detail="Email already registered"
+            )
+        raise HTTPException(
+            status_code=400,
+            detail="Username already taken"
+        )
     
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    counters.record_created(db, "users")
+    await db.commit()
     return db_user
 
 
 @router.get("/{user_id}", response_model=UserSchema)
 async def get_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Retrieve a specific user by ID.
+
+    Users have no `updated_at`, so the ETag follows the users collection
+    version; a match gets a 304 without the user being loaded.
     """
-    db_user = db.query(User).filter(User.id == user_id).first()
+    etag = conditional.make_etag("user", user_id, await collection_version(db, "users"))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+
+    db_user = await db.get(User, user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
+    conditional.set_validators(response, etag)
     return db_user
 
 
@@ -81,42 +114,52 @@ async def get_user(
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a specific user.
     """
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Update user data
     update_data = user_data.model_dump(exclude_unset=True)
     
     # If password is being updated, hash it
     if "password" in update_data:
-        update_data["hashed_password"] = User.hash_password(update_data.pop("password"))
+        update_data["hashed_password"] = await hashing_pool.hash(update_data.pop("password"))
     
-    for key, value in update_data.items():
-        setattr(db_user, key, value)
+    updated = await writes.update_returning(db, User, user_id, update_data)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="User not found")
     
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    await db.commit()
+    principal_cache.invalidate_user(user_id)
+    return updated[0]
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a specific user.
+
+    Their projects and tasks are kept, with no owner or assignee.
     """
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if db_user is None:
+    for model, column in ((Project, Project.owner_id), (Task, Task.assigned_to_id)):
+        await db.execute(
+            update(model).where(column == user_id).values({column.key: None}),
+            execution_options=writes.UPDATE_OPTIONS,
+        )
+    # Counted from what the DELETE removed, so that concurrent deletes of
+    # one user count it down once and all but the first get a 404
+    deleted = (await db.execute(
+        delete(User).where(User.id == user_id).returning(User.id),
+        execution_options=writes.UPDATE_OPTIONS,
+    )).first()
+    if deleted is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    db.delete(db_user)
-    db.commit()
+    counters.record_deleted(db, "users")
+    await db.commit()
+    principal_cache.invalidate_user(user_id)
     return None
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Schema setup run once at application startup (see the lifespan in
+app/main.py) rather than as a side effect of importing the app.
+
+SCHEMA_SETUP selects what happens:
+
+- create: bring the database to the head revision as `migrate` does,
+  then create any tables of the models that no migration has added yet
+  (development default).
+- migrate: apply Alembic migrations up to head. A database without any
+  tables is created from the models and stamped at head, since the
+  initial revision predates the migrations. One with tables but no
+  alembic_version (created by create_all, as the original app did) is
+  stamped with the revision its tables match first.
+- none: leave the schema alone, e.g. when migrations run once per
+  deploy before the workers start:
+
+    python -m app.schema_setup migrate
+"""
+import glob
+import os
+import re
+from typing import Literal, Optional, Set
+
+from sqlalchemy import inspect, text
+
+from app.database import Base, engine
+
+SchemaSetup = Literal["create", "migrate", "none"]
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
+
+# Revisions of databases created by the original app, before any
+# migration of this package: its users, projects and tasks tables, with
+# or without the project dates and tags
+INITIAL_REVISION = "a392a5c15bf7"
+PROJECT_DATES_REVISION = "30ed649a8312"
+BASELINE_TABLES = frozenset({"users", "projects", "tasks"})
+
+_REVISION_RE = re.compile(r"^revision\b[^=]*=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION_RE = re.compile(r"^down_revision\b[^=]*=(.*)$", re.MULTILINE)
+
+
+def _create_tables() -> None:
+    import app.models  # noqa: F401  registers every table
+
+    Base.metadata.create_all(bind=engine)
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    # No ini file: alembic/env.py then leaves the app's logging alone
+    alembic_config = Config()
+    alembic_config.set_main_option("script_location", ALEMBIC_DIR)
+    return alembic_config
+
+
+def _head_revisions() -> Set[str]:
+    """
+    The revisions no other builds on, read from the version files: this
+    lets a database at head start without importing Alembic, which takes
+    longer than the rest of the schema setup.
+    """
+    revisions, parents = set(), set()
+    for path in glob.glob(os.path.join(ALEMBIC_DIR, "versions", "*.py")):
+        with open(path) as f:
+            source = f.read()
+        revision = _REVISION_RE.search(source)
+        down_revision = _DOWN_REVISION_RE.search(source)
+        if revision is not None:
+            revisions.add(revision.group(1))
+        if down_revision is not None:
+            parents.update(re.findall(r"['\"](\w+)['\"]", down_revision.group(1)))
+    return revisions - parents
+
+
+def _current_revision(tables: Set[str]) -> Optional[str]:
+    if "alembic_version" not in tables:
+        return None
+    with engine.connect() as conn:
+        return conn.scalar(text("SELECT version_num FROM alembic_version"))
+
+
+def _unversioned_revision(tables: Set[str]) -> str:
+    """
+    The revision matching a database that has tables but was never
+    stamped: one created by create_all of the current models (`create`
+    mode did not stamp), or one of the original app.
+    """
+    import app.models  # noqa: F401  registers every table
+
+    if set(Base.metadata.tables) <= tables:
+        return "head"
+    if tables <= BASELINE_TABLES:
+        columns = inspect(engine).get_columns("projects") if "projects" in tables else []
+        return PROJECT_DATES_REVISION if any(column["name"] == "tags" for column in columns) else INITIAL_REVISION
+    raise RuntimeError(
+        "The database has tables but no alembic_version, and they match no known revision. "
+        "Stamp it with `alembic stamp <revision>` and run `python -m app.schema_setup migrate`."
+    )
+
+
+def _migrate() -> None:
+    tables = set(inspect(engine).get_table_names())
+    current = _current_revision(tables)
+    if current is not None and current in _head_revisions():
+        return
+
+    from alembic import command
+
+    alembic_config = _alembic_config()
+    if not tables:
+        _create_tables()
+        command.stamp(alembic_config, "head")
+        return
+    if current is None:
+        command.stamp(alembic_config, _unversioned_revision(tables))
+    command.upgrade(alembic_config, "head")
+
+
+def setup_schema(mode: SchemaSetup) -> None:
+    if mode == "create":
+        _migrate()
+        _create_tables()
+    elif mode == "migrate":
+        _migrate()
+    elif mode != "none":
+        raise ValueError(f"Unknown SCHEMA_SETUP mode: {mode!r}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    setup_schema(sys.argv[1] if len(sys.argv) > 1 else "migrate")
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+from app.schemas.task import Task
+
+
+class BoardColumn(BaseModel):
+    status: str
+    count: int
+    tasks: List[Task]
+    next_cursor: Optional[str] = None
+
+
+class Board(BaseModel):
+    project_id: int
+    columns: List[BoardColumn]
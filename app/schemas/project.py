@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime, date
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class ProjectBase(BaseModel):
@@ -34,3 +34,48 @@ class Project(ProjectBase):
     class Config:
         orm_mode = True
         from_attributes = True
+
+
+class ProjectProgress(BaseModel):
+    total: int = 0
+    done: int = 0
+    percent_done: float = 0.0
+    overdue: int = 0  # not done and past their due date
+    by_status: Dict[str, int] = {}
+
+
+class ProjectWithProgress(Project):
+    progress: ProjectProgress = ProjectProgress()
+
+
+class ProjectSummary(BaseModel):
+    """A project as lists return it by default: every field but the description."""
+    name: str
+    status: Optional[str] = "planning"
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    tags: Optional[str] = None
+    id: int
+    created_at: datetime
+    updated_at: datetime
+    owner_id: int
+    progress: ProjectProgress = ProjectProgress()
+
+
+class BurndownDay(BaseModel):
+    date: date
+    total: int
+    done: int
+    remaining: int
+    completed: int  # tasks that changed to done that day
+    by_status: Dict[str, int]
+
+
+class Burndown(BaseModel):
+    project_id: int
+    days: List[BurndownDay]
+
+
+class TagCount(BaseModel):
+    name: str
+    count: int
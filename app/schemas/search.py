@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+
+class ProjectHit(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    status: Optional[str] = None
+    tags: Optional[str] = None
+    created_at: Optional[datetime] = None
+    score: float
+
+
+class TaskHit(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    project_id: int
+    score: float
+
+
+class SearchResults(BaseModel):
+    query: str
+    projects: List[ProjectHit] = []
+    tasks: List[TaskHit] = []
@@ -0,0 +1,46 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class EntityCounts(BaseModel):
+    total: int = 0
+    by_status: Dict[str, int] = {}
+
+
+class UserCounts(BaseModel):
+    total: int = 0
+
+
+class StatsSummary(BaseModel):
+    projects: EntityCounts
+    tasks: EntityCounts
+    users: UserCounts
+
+
+class AuthCacheStats(BaseModel):
+    size: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    invalidations: int
+
+
+class ChangeFeedStats(BaseModel):
+    last_event_id: str
+    published: int
+    buffered: int
+    subscribers: int
+
+
+class DeadlineSchedulerStats(BaseModel):
+    loaded: bool
+    deadlines: int
+    window_start: Optional[datetime]
+    window_end: Optional[datetime]
+    reloaded_at: Optional[datetime]
+    due_soon_published: int
+    overdue_published: int
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class TaskBase(BaseModel):
@@ -35,3 +35,43 @@ class Task(TaskBase):
     class Config:
         orm_mode = True
         from_attributes = True
+
+
+class TaskSummary(BaseModel):
+    """A task as lists return it by default: every field but the description."""
+    title: str
+    status: Optional[str] = "todo"
+    priority: Optional[str] = "medium"
+    due_date: Optional[datetime] = None
+    project_id: int
+    id: int
+    created_at: datetime
+    updated_at: datetime
+    assigned_to_id: Optional[int] = None
+
+
+# Largest number of operations accepted by one /tasks/batch request
+MAX_BATCH_ITEMS = 1000
+
+
+class TaskBatchUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBatch(BaseModel):
+    create: List[TaskCreate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    update: List[TaskBatchUpdate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    delete: List[int] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+
+
+class TaskBatchItem(BaseModel):
+    op: str  # create, update, delete
+    index: int  # position of the item in its list of the request
+    id: Optional[int] = None
+    ok: bool = True
+    error: Optional[str] = None
+    task: Optional[Task] = None
+
+
+class TaskBatchResult(BaseModel):
+    results: List[TaskBatchItem]
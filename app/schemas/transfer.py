@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+from app.schemas.project import ProjectCreate
+from app.schemas.task import TaskCreate
+
+
+class ProjectImport(ProjectCreate):
+    id: Optional[int] = None
+    owner_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class TaskImport(TaskCreate):
+    id: Optional[int] = None
+    assigned_to_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class ImportResult(BaseModel):
+    entity: str
+    imported: int
+    batches: int
@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import func, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task
+from app.services.pagination import decode_cursor_keys, encode_cursor
+
+BOARD_COLUMNS = ("todo", "in_progress", "done")
+# Display order within a column; any other priority sorts after these
+PRIORITIES = ("high", "medium", "low")
+OTHER_PRIORITY = len(PRIORITIES)
+
+
+def priority_rank(priority: Optional[str]) -> int:
+    return PRIORITIES.index(priority) if priority in PRIORITIES else OTHER_PRIORITY
+
+
+def _segment_queries(project_id: int, status: str, limit: int, cursor: Optional[str]) -> List:
+    """
+    One query per priority of a column, each an index range scan on
+    ix_tasks_project_status_priority that is already ordered by ID.
+    Concatenated by rank they give the column in display order, without
+    sorting the project's tasks.
+    """
+    after_rank, after_id = -1, 0
+    if cursor:
+        after_rank, after_id = decode_cursor_keys(cursor, "rank", "id")
+        if not 0 <= after_rank <= OTHER_PRIORITY:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    queries = []
+    for rank in range(max(after_rank, 0), OTHER_PRIORITY + 1):
+        if rank == OTHER_PRIORITY:
+            in_segment = or_(Task.priority.is_(None), Task.priority.notin_(PRIORITIES))
+        else:
+            in_segment = Task.priority == PRIORITIES[rank]
+        query = select(Task).where(Task.project_id == project_id, Task.status == status, in_segment)
+        if rank == after_rank:
+            query = query.where(Task.id > after_id)
+        # LIMIT inside a UNION member needs its own subquery
+        queries.append(query.order_by(Task.id).limit(limit + 1).subquery().select())
+    return queries
+
+
+async def load_board(db: AsyncSession, project_id: int, limit: int,
+                     columns: Sequence[str] = BOARD_COLUMNS, cursor: Optional[str] = None) -> List[dict]:
+    """
+    Build the board columns of a project: each holds up to `limit` tasks
+    ordered by priority then ID, the column's total count and a cursor for
+    the next page of that column. `cursor` applies when a single column is
+    requested.
+    """
+    segments = [
+        query
+        for status in columns
+        for query in _segment_queries(project_id, status, limit, cursor if len(columns) == 1 else None)
+    ]
+    stmt = select(Task).from_statement(union_all(*segments))
+    by_column: Dict[str, List[Task]] = {status: [] for status in columns}
+    for task in (await db.scalars(stmt)).all():
+        by_column[task.status].append(task)
+
+    counts = dict((await db.execute(
+        select(Task.status, func.count(Task.id))
+        .where(Task.project_id == project_id, Task.status.in_(columns))
+        .group_by(Task.status)
+    )).all())
+
+    board = []
+    for status in columns:
+        tasks = sorted(by_column[status], key=lambda task: (priority_rank(task.priority), task.id))
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            last = tasks[-1]
+            next_cursor = encode_cursor(last.id, rank=priority_rank(last.priority))
+        board.append({"status": status, "count": counts.get(status, 0), "tasks": tasks, "next_cursor": next_cursor})
+    return board
@@ -0,0 +1,56 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+# Execution options for bulk INSERTs of insert_rows() groups. The ORM's
+# bulk INSERT leaves None values out of the statement, so rows that differ
+# in which fields are None cannot share it and the executemany degrades to
+# one INSERT per row. The raw strategy runs the statement as Core does: one
+# executemany per group, None inserted as NULL, Python-side defaults (such
+# as timestamps) still applied. RETURNING then yields rows, not entities.
+INSERT_OPTIONS = {"dml_strategy": "raw"}
+
+
+@lru_cache(maxsize=None)
+def _column_defaults(model) -> Tuple[Dict[str, object], FrozenSet[str]]:
+    """Scalar defaults by column, and the columns generated on insert."""
+    scalar = {}
+    generated = set()
+    for column in model.__table__.columns:
+        if column.default is not None and column.default.is_scalar:
+            scalar[column.key] = column.default.arg
+        elif column.default is not None or column.primary_key:
+            generated.add(column.key)
+    return scalar, frozenset(generated)
+
+
+def insert_row(model, values: dict) -> dict:
+    """
+    Values of one row for a bulk INSERT. None becomes the column's default
+    where it has one, as for an ORM add; generated columns (IDs,
+    timestamps) are left out so the database or Core fills them, and other
+    None values are inserted as NULL.
+    """
+    scalar, generated = _column_defaults(model)
+    row = {}
+    for key, value in values.items():
+        if value is None:
+            if key in scalar:
+                value = scalar[key]
+            elif key in generated:
+                continue
+        row[key] = value
+    return row
+
+
+def insert_rows(model, values: Iterable[dict]) -> List[List[dict]]:
+    """
+    insert_row() of every row, grouped by the columns they set (e.g. rows
+    with and without an explicit ID), in order of first appearance. An
+    executemany takes its columns from its first row, so each group needs
+    its own statement; a uniform batch is a single group.
+    """
+    groups: Dict[FrozenSet[str], List[dict]] = {}
+    for item in values:
+        row = insert_row(model, item)
+        groups.setdefault(frozenset(row), []).append(row)
+    return list(groups.values())
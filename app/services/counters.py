@@ -0,0 +1,104 @@
+from collections import Counter as Deltas
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.counter import Counter
+
+# Session.info key holding the adjustments recorded by the current transaction
+PENDING_DELTAS = "counter_deltas"
+
+
+def status_deltas(entity: str, old_status: Optional[str], new_status: Optional[str],
+                  exists_before: bool = True, exists_after: bool = True) -> Deltas:
+    """
+    Counter adjustments for one row of `entity` moving from `old_status`
+    to `new_status`. Creations pass exists_before=False, deletions
+    exists_after=False.
+    """
+    deltas = Deltas()
+    if exists_before:
+        deltas[f"{entity}.total"] -= 1
+        if old_status is not None:
+            deltas[f"{entity}.status.{old_status}"] -= 1
+    if exists_after:
+        deltas[f"{entity}.total"] += 1
+        if new_status is not None:
+            deltas[f"{entity}.status.{new_status}"] += 1
+    return deltas
+
+
+def apply(db, deltas: Dict[str, int]) -> None:
+    """
+    Record counter adjustments on the session. They are written with a
+    single upsert when the session commits, inside the same transaction
+    as the change being counted, so recording them costs no round trip
+    and does not take the write lock early.
+    """
+    db.info.setdefault(PENDING_DELTAS, Deltas()).update(deltas)
+
+
+def record_created(db, entity: str, status: Optional[str] = None) -> None:
+    apply(db, status_deltas(entity, None, status, exists_before=False))
+
+
+def record_deleted(db, entity: str, status: Optional[str] = None) -> None:
+    apply(db, status_deltas(entity, status, None, exists_after=False))
+
+
+def record_status_change(db, entity: str, old_status: Optional[str], new_status: Optional[str]) -> None:
+    if old_status != new_status:
+        apply(db, status_deltas(entity, old_status, new_status))
+
+
+def record_bulk_deleted(db, entity: str, status_counts: Iterable[Tuple[Optional[str], int]]) -> None:
+    """Record the deletion of many rows given (status, count) pairs."""
+    deltas = Deltas()
+    for status, count in status_counts:
+        deltas[f"{entity}.total"] -= count
+        if status is not None:
+            deltas[f"{entity}.status.{status}"] -= count
+    apply(db, deltas)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_deltas(session: Session) -> None:
+    # before_commit runs ahead of the final flush; flush now so that
+    # deltas recorded by flush hooks (see versions.py) are included
+    session.flush()
+    pending = session.info.pop(PENDING_DELTAS, None)
+    params = [{"name": name, "value": value} for name, value in (pending or {}).items() if value]
+    if not params:
+        return
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(Counter)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Counter.name],
+        set_={"value": Counter.value + stmt.excluded.value},
+    )
+    session.execute(stmt, params)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_deltas(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING_DELTAS, None)
+
+
+async def summarize(db: AsyncSession) -> Dict[str, dict]:
+    """Group every counter into {entity: {"total": n, "by_status": {...}}}."""
+    summary: Dict[str, dict] = {}
+    rows = await db.execute(
+        select(Counter.name, Counter.value)
+        .where(Counter.name.notlike("version.%"), Counter.name.notlike("compaction.%"))
+    )
+    for name, value in rows:
+        entity, _, key = name.partition(".")
+        bucket = summary.setdefault(entity, {"total": 0, "by_status": {}})
+        if key == "total":
+            bucket["total"] = value
+        elif key.startswith("status.") and value:
+            bucket["by_status"][key[len("status."):]] = value
+    return summary
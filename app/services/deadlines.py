@@ -0,0 +1,360 @@
+"""
+Deadline scheduler and the due-soon and overdue task feeds.
+
+Each worker holds the deadlines of open tasks (any status but done) due
+from now to DEADLINE_HORIZON_HOURS ahead, sorted by due date. The window
+is read with one range scan of
+ix_tasks_due_date_id when the app starts and every
+DEADLINE_RELOAD_SECONDS after that, which slides it forward and picks up
+the writes of other workers. In between, the task write paths record the
+due dates they set on the session, and they are applied once it commits,
+like the rollups.
+
+A background task sleeps until the next deadline to cross. It then
+publishes, on the project's change feed, "task.due_soon" once a task is
+due within DEADLINE_DUE_SOON_HOURS and "task.overdue" once its due date
+passes. GET /tasks/due-soon pages through the window and reads the rows
+by primary key; without a loaded window (DEADLINE_RELOAD_SECONDS=0, or
+before the first load) it range-scans the index instead. GET
+/tasks/overdue has no lower bound, so it always scans the index back
+from now.
+"""
+import asyncio
+import bisect
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import event, select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import config
+from app.database import open_session
+from app.models.task import Task
+from app.services.events import change_feed
+from app.services.pagination import decode_cursor_keys, encode_cursor
+from app.services.rollups import DONE_STATUS
+from app.services.task_queries import from_micros, to_micros
+
+logger = logging.getLogger(__name__)
+
+# Session.info keys holding what the current transaction recorded: the
+# due date, project and status of each written task (None once deleted),
+# and the deleted projects
+PENDING_DEADLINES = "deadlines"
+PENDING_PROJECTS = "deadline_projects"
+
+# (due date, project ID, status) of a task after a write
+TaskState = Tuple[Optional[datetime], Optional[int], Optional[str]]
+# Sort key of a deadline
+Key = Tuple[datetime, int]
+
+_LAST = float("inf")  # sorts after every task ID of the same due date
+
+
+def record_task(db, task_id: int, project_id: Optional[int], due_date: Optional[datetime],
+                status: Optional[str]) -> None:
+    """Record the state a task is left in by this transaction."""
+    db.info.setdefault(PENDING_DEADLINES, {})[task_id] = (due_date, project_id, status)
+
+
+def record_task_deleted(db, task_id: int) -> None:
+    db.info.setdefault(PENDING_DEADLINES, {})[task_id] = None
+
+
+def record_project_deleted(db, project_id: int) -> None:
+    db.info.setdefault(PENDING_PROJECTS, set()).add(project_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_deadlines(session: Session) -> None:
+    # Also called when a savepoint is released; the transaction may still roll back
+    if session.in_nested_transaction():
+        return
+    changes = session.info.pop(PENDING_DEADLINES, None)
+    projects = session.info.pop(PENDING_PROJECTS, None)
+    if changes or projects:
+        scheduler.apply(changes or {}, projects or set())
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_deadlines(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING_DEADLINES, None)
+    session.info.pop(PENDING_PROJECTS, None)
+
+
+class DeadlineScheduler:
+    """
+    One worker's window of deadlines and the task that announces them.
+
+    apply() may be called from any thread (sync sessions commit in the
+    threadpool); the rest runs on the event loop. Events cover deadlines
+    this worker knows of when they are crossed, so like the change feed
+    they only reflect other workers' writes after a reload.
+    """
+
+    def __init__(self, horizon: timedelta, due_soon: timedelta):
+        self.horizon = horizon
+        self.due_soon = due_soon
+        self._lock = threading.Lock()
+        self._order: List[Key] = []
+        self._deadlines: Dict[int, Tuple[datetime, int]] = {}  # task ID -> (due date, project ID)
+        self._window: Optional[Tuple[datetime, datetime]] = None  # [start, end) held, once loaded
+        self._replay: Optional[list] = None  # changes committed while a reload reads
+        # Events were published for deadlines up to these instants
+        self._soon_through: Optional[datetime] = None
+        self._overdue_through: Optional[datetime] = None
+        self._announce: List[Key] = []  # deadlines set within the due-soon range already passed
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.reloaded_at: Optional[datetime] = None
+        self.due_soon_published = 0
+        self.overdue_published = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._window is not None
+
+    def _remove(self, task_id: int) -> None:
+        entry = self._deadlines.pop(task_id, None)
+        if entry is not None:
+            index = bisect.bisect_left(self._order, (entry[0], task_id))
+            del self._order[index]
+
+    def _set(self, task_id: int, state: Optional[TaskState]) -> None:
+        previous = self._deadlines.get(task_id)
+        self._remove(task_id)
+        if state is None:
+            return
+        due, project_id, status = state
+        start, end = self._window
+        if due is None or status == DONE_STATUS or project_id is None or not start <= due < end:
+            return
+        bisect.insort(self._order, (due, task_id))
+        self._deadlines[task_id] = (due, project_id)
+        if (previous is None or previous[0] != due) and self._overdue_through < due <= self._soon_through:
+            self._announce.append((due, task_id))
+
+    def _apply(self, changes: Dict[int, Optional[TaskState]], projects: Set[int]) -> None:
+        if projects:
+            for task_id in [task_id for task_id, (_, project_id) in self._deadlines.items() if project_id in projects]:
+                self._remove(task_id)
+        for task_id, state in changes.items():
+            self._set(task_id, state)
+
+    def apply(self, changes: Dict[int, Optional[TaskState]], projects: Set[int]) -> None:
+        """Take in the writes of a committed transaction."""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((changes, projects))
+            if self._window is None:
+                return
+            self._apply(changes, projects)
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def reload(self) -> None:
+        """Read the window from the due date index."""
+        now = datetime.utcnow()
+        # Deadlines crossed since the last publish are kept for their events
+        start, end = self._overdue_through or now, now + self.horizon
+        with self._lock:
+            self._replay = []
+        try:
+            async with open_session() as db:
+                rows = (await db.execute(
+                    select(Task.due_date, Task.id, Task.project_id)
+                    .where(Task.due_date >= start, Task.due_date < end, Task.status.is_distinct_from(DONE_STATUS),
+                           Task.project_id.isnot(None))
+                    .order_by(Task.due_date, Task.id)
+                )).all()
+        except BaseException:
+            with self._lock:
+                self._replay = None
+            raise
+        with self._lock:
+            self._order = [(due, task_id) for due, task_id, _ in rows]
+            self._deadlines = {task_id: (due, project_id) for due, task_id, project_id in rows}
+            self._window = (start, end)
+            if self._overdue_through is None:
+                self._overdue_through, self._soon_through = now, now + self.due_soon
+            # Commits the read may not have seen, in commit order
+            for changes, projects in self._replay:
+                self._apply(changes, projects)
+            self._replay = None
+            self.reloaded_at = now
+
+    def _due_events(self, now: datetime) -> List[Tuple[str, int, Key]]:
+        """The (event, project ID, deadline) to publish as of `now`."""
+        with self._lock:
+            if self._window is None:
+                return []
+            order = self._order
+            soon_end = now + self.due_soon
+            soon = order[bisect.bisect_right(order, (self._soon_through, _LAST)):
+                         bisect.bisect_right(order, (soon_end, _LAST))]
+            overdue = order[bisect.bisect_right(order, (self._overdue_through, _LAST)):
+                            bisect.bisect_right(order, (now, _LAST))]
+            soon += [key for key in self._announce if self._deadlines.get(key[1], (None,))[0] == key[0]]
+            self._announce = []
+            self._soon_through, self._overdue_through = soon_end, now
+            due_events = [("task.due_soon", key) for key in soon if key[0] > now]
+            due_events += [("task.overdue", key) for key in overdue]
+            return [(name, self._deadlines[key[1]][1], key) for name, key in due_events]
+
+    def _seconds_to_next(self, now: datetime) -> Optional[float]:
+        with self._lock:
+            if self._window is None:
+                return None
+            order = self._order
+            upcoming = []
+            index = bisect.bisect_right(order, (self._overdue_through, _LAST))
+            if index < len(order):
+                upcoming.append(order[index][0])
+            index = bisect.bisect_right(order, (self._soon_through, _LAST))
+            if index < len(order):
+                upcoming.append(order[index][0] - self.due_soon)
+        return max(0.0, (min(upcoming) - now).total_seconds()) if upcoming else None
+
+    def publish_due(self, now: Optional[datetime] = None) -> int:
+        """Publish the events of the deadlines crossed by `now`; returns how many."""
+        due_events = self._due_events(now or datetime.utcnow())
+        for name, project_id, (due, task_id) in due_events:
+            change_feed.publish(project_id, name, {"id": task_id, "due_date": due})
+            if name == "task.overdue":
+                self.overdue_published += 1
+            else:
+                self.due_soon_published += 1
+        return len(due_events)
+
+    async def _run(self, reload_interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        next_reload = loop.time()
+        while True:
+            if loop.time() >= next_reload:
+                try:
+                    await self.reload()
+                except Exception:
+                    logger.exception("Loading task deadlines failed")
+                next_reload = loop.time() + reload_interval
+            self._wakeup.clear()
+            self.publish_due()
+            delay = next_reload - loop.time()
+            until_next = self._seconds_to_next(datetime.utcnow())
+            if until_next is not None:
+                delay = min(delay, until_next)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(delay, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, reload_interval: float = config.DEADLINE_RELOAD_SECONDS) -> None:
+        """Load the window and announce deadlines until stop(); 0 disables it."""
+        if reload_interval > 0 and (self._task is None or self._task.done()):
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = self._loop.create_task(self._run(reload_interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+        with self._lock:
+            self._window = None
+            self._order, self._deadlines, self._announce = [], {}, []
+            self._soon_through = self._overdue_through = None
+
+    def page(self, start: datetime, end: datetime, after: Optional[Key], limit: int,
+             descending: bool = False, project_id: Optional[int] = None) -> Optional[List[Key]]:
+        """
+        Up to `limit` deadlines due in [start, end) past the `after` key,
+        in order, or None when the window does not cover the range.
+        """
+        with self._lock:
+            if self._window is None or start < self._window[0] or end > self._window[1]:
+                return None
+            order = self._order
+            low, high = bisect.bisect_left(order, (start,)), bisect.bisect_left(order, (end,))
+            if after is not None and descending:
+                high = min(high, bisect.bisect_left(order, after))
+            elif after is not None:
+                low = max(low, bisect.bisect_right(order, after))
+            indexes = range(high - 1, low - 1, -1) if descending else range(low, high)
+            keys = []
+            for index in indexes:
+                key = order[index]
+                if project_id is None or self._deadlines[key[1]][1] == project_id:
+                    keys.append(key)
+                    if len(keys) == limit:
+                        break
+            return keys
+
+    def stats(self) -> dict:
+        with self._lock:
+            start, end = self._window or (None, None)
+            return {
+                "loaded": self._window is not None,
+                "deadlines": len(self._order),
+                "window_start": start,
+                "window_end": end,
+                "reloaded_at": self.reloaded_at,
+                "due_soon_published": self.due_soon_published,
+                "overdue_published": self.overdue_published,
+            }
+
+
+scheduler = DeadlineScheduler(
+    horizon=timedelta(hours=config.DEADLINE_HORIZON_HOURS),
+    due_soon=timedelta(hours=config.DEADLINE_DUE_SOON_HOURS),
+)
+
+
+async def load_feed(db: AsyncSession, columns: Sequence, start: Optional[datetime], end: datetime, limit: int,
+                    cursor: Optional[str] = None, descending: bool = False,
+                    project_id: Optional[int] = None) -> Tuple[List[Row], Optional[str]]:
+    """
+    A page of `columns` rows (which must include due_date and id) of the
+    open tasks due in [start, end), by due date, and the next cursor. A
+    None `start` has no lower bound and is always read from the index.
+    """
+    after = None
+    if cursor:
+        due, task_id = decode_cursor_keys(cursor, "due", "id")
+        after = (from_micros(due), task_id)
+    conditions = [Task.due_date < end, Task.status.is_distinct_from(DONE_STATUS)]
+    if start is not None:
+        conditions.append(Task.due_date >= start)
+    if project_id is not None:
+        conditions.append(Task.project_id == project_id)
+
+    keys = None if start is None else scheduler.page(start, end, after, limit + 1, descending, project_id)
+    if keys is None:
+        query = select(*columns).where(*conditions)
+        if after is not None:
+            key = tuple_(Task.due_date, Task.id)
+            query = query.where(key < tuple_(*after) if descending else key > tuple_(*after))
+        order = (Task.due_date.desc(), Task.id.desc()) if descending else (Task.due_date, Task.id)
+        rows = (await db.execute(query.order_by(*order).limit(limit + 1))).all()
+        keys = [(row.due_date, row.id) for row in rows]
+    else:
+        # The conditions again: the window may not have caught up with a write yet
+        found = {row.id: row for row in (await db.execute(
+            select(*columns).where(Task.id.in_([task_id for _, task_id in keys[:limit]]), *conditions)
+        )).all()}
+        rows = [found[task_id] for _, task_id in keys[:limit] if task_id in found]
+    if len(keys) <= limit:
+        return rows[:limit], None
+    due, task_id = keys[limit - 1]
+    return rows[:limit], encode_cursor(task_id, due=to_micros(due))
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import secrets
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, Iterable, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from app import config
+
+# Sent instead of the events a subscriber can no longer receive; clients
+# respond by refetching the board
+RESET_EVENT = "reset"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    id: int
+    event_id: str  # the SSE ID: the feed's epoch and `id`
+    project_id: int
+    frame: str  # the encoded SSE frame, built once for every subscriber
+
+
+def format_sse(event_id: str, event: str, data: str) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """One client's bounded buffer of events for a project."""
+
+    def __init__(self, project_id: int, max_queued: int):
+        self.project_id = project_id
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=max_queued)
+
+    def offer(self, event: ChangeEvent) -> None:
+        try:
+            self.queue.put_nowait(event.frame)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop what is buffered and tell the
+            # client to resync, rather than growing without bound
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(format_sse(event.event_id, RESET_EVENT, "{}"))
+
+
+class ChangeFeed:
+    """
+    In-process pub/sub of per-project change events.
+
+    Routers publish compact deltas after their transaction commits; every
+    subscriber of the project gets the same pre-encoded frame. A global
+    ring buffer of recent events lets reconnecting clients resume from
+    Last-Event-ID. Event IDs are "<epoch>-<n>": `n` counts from 1 in every
+    process, so the random epoch tells IDs of an earlier process (before a
+    restart, or another worker) apart from this feed's. Subscribers only see writes made by this process, so
+    multi-worker deployments need a shared broker in front of this.
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(self, history_size: int, max_queued: int):
+        self.max_queued = max_queued
+        self.epoch = secrets.token_hex(4)
+        self.last_id = 0
+        self.published = 0
+        self._history: Deque[ChangeEvent] = deque(maxlen=history_size)
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+
+    def event_id(self, number: int) -> str:
+        return f"{self.epoch}-{number}"
+
+    def publish(self, project_id: int, event: str, data: dict) -> int:
+        self.last_id += 1
+        self.published += 1
+        event_id = self.event_id(self.last_id)
+        change = ChangeEvent(
+            id=self.last_id,
+            event_id=event_id,
+            project_id=project_id,
+            frame=format_sse(event_id, event, json.dumps(jsonable_encoder(data), separators=(",", ":"))),
+        )
+        self._history.append(change)
+        for subscription in self._subscribers.get(project_id, ()):
+            subscription.offer(change)
+        return change.id
+
+    def subscribe(self, project_id: int, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Register a subscriber. With `last_event_id` the events it missed
+        are queued first, or a reset if they are no longer buffered or the
+        ID is not one of this feed's, e.g. was issued before a restart.
+        """
+        subscription = Subscription(project_id, self.max_queued)
+        if last_event_id is not None:
+            epoch, _, sequence = last_event_id.rpartition("-")
+            after = int(sequence) if epoch == self.epoch and sequence.isdigit() else None
+            oldest = self._history[0].id if self._history else self.last_id + 1
+            if after is None or after > self.last_id or after + 1 < oldest:
+                subscription.queue.put_nowait(format_sse(self.event_id(self.last_id), RESET_EVENT, "{}"))
+            else:
+                for change in self._history:
+                    if change.id > after and change.project_id == project_id:
+                        subscription.offer(change)
+        self._subscribers.setdefault(project_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.project_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.project_id]
+
+    def stats(self) -> dict:
+        return {
+            "last_event_id": self.event_id(self.last_id),
+            "published": self.published,
+            "buffered": len(self._history),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+        }
+
+
+change_feed = ChangeFeed(config.EVENT_HISTORY_SIZE, config.EVENT_QUEUE_SIZE)
+
+
+async def event_stream(project_id: int, last_event_id: Optional[str] = None,
+                       keepalive: float = config.EVENT_KEEPALIVE_SECONDS) -> AsyncIterator[str]:
+    """
+    SSE body for a project. Subscribes on the first iteration, so a client
+    that disconnects before the response starts leaves nothing behind,
+    and unsubscribes when the client goes away.
+    """
+    subscription = change_feed.subscribe(project_id, last_event_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                yield await asyncio.wait_for(subscription.queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+    finally:
+        change_feed.unsubscribe(subscription)
+
+
+def changed_fields(obj, fields: Iterable[str]) -> dict:
+    """The compact delta for an update: the ID, updated_at and the set fields."""
+    names: List[str] = ["id", *fields]
+    if hasattr(obj, "updated_at"):
+        names.append("updated_at")
+    return {name: getattr(obj, name) for name in dict.fromkeys(names)}
@@ -0,0 +1,56 @@
+from typing import Any, Callable, List, Optional, Sequence, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import Column
+from sqlalchemy.engine import Row
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> List[Column]:
+    """
+    The table columns of `model` behind each field of `schema`, in field
+    order, so a Core select returns exactly what the schema would dump.
+    """
+    return [model.__table__.c[name] for name in schema.model_fields]
+
+
+class RowsJSONResponse(Response):
+    """
+    JSON response for plain column rows, encoded with orjson.
+
+    List endpoints return it directly, which bypasses response_model
+    validation: no ORM object or pydantic model is built per row. orjson
+    renders naive datetimes and dates exactly as pydantic does.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: List[dict]) -> bytes:
+        return orjson.dumps(content)
+
+
+def rows_response(rows: Sequence[Row], fields: Optional[Sequence[str]] = None,
+                  **computed: Callable[[Row], Any]) -> RowsJSONResponse:
+    """
+    One object per row, of the row's columns named in `fields` (default
+    all); `computed` adds fields derived from the row, e.g. data loaded
+    for the whole page with one extra query.
+    """
+    if not rows:
+        return RowsJSONResponse([])
+    # Labels of subquery columns are str subclasses, which orjson rejects as keys
+    keys = [str(key) for key in rows[0]._fields]
+    values = rows
+    if fields is not None:
+        # Columns loaded only as sort keys stay out of the body
+        keep = [index for index, key in enumerate(keys) if key in fields]
+        if len(keep) < len(keys):
+            keys = [keys[index] for index in keep]
+            values = [[row[index] for index in keep] for row in rows]
+    if not computed:
+        return RowsJSONResponse([dict(zip(keys, value)) for value in values])
+    return RowsJSONResponse([
+        {**dict(zip(keys, value)), **{name: field(row) for name, field in computed.items()}}
+        for row, value in zip(rows, values)
+    ])
@@ -0,0 +1,66 @@
+"""
+Sparse fieldsets of the list endpoints.
+
+Without `fields` a list returns its summary representation, which leaves
+out unbounded text such as descriptions. `fields=title,status` (or the
+parameter repeated) picks fields instead, and `fields=all` returns every
+one. Only the columns behind the returned fields are selected, so large
+text is neither read nor encoded unless asked for. The ID is always
+returned: clients key items on it and cursors are built from it.
+"""
+from dataclasses import dataclass
+from typing import FrozenSet, List, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import Column
+
+ALL = "all"
+
+
+@dataclass(frozen=True)
+class Fieldset:
+    model: type
+    fields: Tuple[str, ...]  # every field, in response order
+    summary: Tuple[str, ...]  # the default, in response order
+    computed: FrozenSet[str] = frozenset()  # fields not backed by a column
+
+    @classmethod
+    def of(cls, model: type, schema: Type[BaseModel], summary: Type[BaseModel],
+           computed: Sequence[str] = ()) -> "Fieldset":
+        """The fields of `schema`, summarized as those of `summary`."""
+        fields = tuple(schema.model_fields)
+        return cls(model, fields, tuple(name for name in fields if name in summary.model_fields), frozenset(computed))
+
+    def select(self, requested: Sequence[str]) -> Tuple[str, ...]:
+        """The fields to return for a `fields` parameter, in response order."""
+        names = {name.strip() for value in requested for name in value.split(",")} - {""}
+        if not names:
+            return self.summary
+        if ALL in names:
+            return self.fields
+        unknown = names.difference(self.fields)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}; choose from {', '.join(self.fields)}",
+            )
+        names.add("id")
+        return tuple(name for name in self.fields if name in names)
+
+    def tag(self, fields: Sequence[str]) -> str:
+        """Names the representation of `fields` in an ETag."""
+        if tuple(fields) == self.summary:
+            return "summary"
+        if tuple(fields) == self.fields:
+            return ALL
+        return ".".join(fields)
+
+    def columns(self, fields: Sequence[str], *keys: str) -> List[Column]:
+        """
+        The columns behind `fields`, followed by those of `keys` (e.g. a
+        sort key for the cursor) that are not among them.
+        """
+        names = [name for name in fields if name not in self.computed]
+        names += [name for name in keys if name not in names]
+        return [self.model.__table__.c[name] for name in names]
@@ -0,0 +1,65 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(last_id: int, **keys: int) -> str:
+    """Encode the sort key of the last row of a page; `keys` precede the ID."""
+    payload = json.dumps({**keys, "id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor_keys(cursor: str, *names: str) -> Tuple[int, ...]:
+    """Decode the integer fields `names` of a cursor, or fail with a 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values = tuple(payload[name] for name in names)
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not all(isinstance(value, int) for value in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def decode_cursor(cursor: str) -> int:
+    return decode_cursor_keys(cursor, "id")[0]
+
+
+def apply_cursor(query, id_column, cursor: Optional[str], limit: int, skip: int = 0):
+    """
+    Restrict `query` (a Query or Select) to the page after `cursor`.
+
+    Rows are ordered by `id_column`, so a page is an index range scan that
+    costs the same however deep it is. One extra row is fetched to tell
+    whether another page follows; pass the result to `split_page`.
+    `skip` is only honoured without a cursor, for older clients.
+    """
+    if cursor:
+        query = query.filter(id_column > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    return query.order_by(id_column).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].id)
+
+
+def set_page_headers(request: Request, response: Response, next_cursor: Optional[str]) -> None:
+    """Advertise the next page through X-Next-Cursor and a Link header."""
+    if next_cursor is None:
+        return
+    next_url = request.url.remove_query_params("skip").include_query_params(cursor=next_cursor)
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
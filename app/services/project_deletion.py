@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from collections import Counter as StatusCounts
+from typing import Dict
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import config
+from app.database import USE_WRITER
+from app.models.project import Project
+from app.models.rollup import ProjectDailySnapshot, ProjectTaskCount, TaskEvent
+from app.models.tag import ProjectTag
+from app.models.task import Task
+from app.services import counters, deadlines, rollups
+from app.services.events import change_feed
+from app.write_queue import write_queue
+
+logger = logging.getLogger(__name__)
+
+# Background deletions in progress, by project ID
+_running: Dict[int, "asyncio.Task[None]"] = {}
+
+
+async def delete_project_rows(db: AsyncSession, project_id: int) -> bool:
+    """
+    Delete a project, its tasks, tag links, rollups and task history with
+    one DELETE per table instead of loading every task into the session. Returns False
+    if the project does not exist. The caller commits.
+
+    Tasks are deleted explicitly, so this does not depend on the
+    database cascading the foreign key (older SQLite files lack it).
+    """
+    # Read the status and counts inside the write transaction, so that a
+    # concurrent delete cannot make the counters go down twice
+    db.info[USE_WRITER] = True
+    project_status = (await db.execute(select(Project.status).where(Project.id == project_id))).first()
+    if project_status is None:
+        return False
+
+    task_status_counts = (await db.execute(
+        select(Task.status, func.count(Task.id))
+        .where(Task.project_id == project_id)
+        .group_by(Task.status)
+    )).all()
+    counters.record_bulk_deleted(db, "tasks", task_status_counts)
+    counters.record_deleted(db, "projects", project_status.status)
+    # Earlier chunks in the same group commit may have counted down its rollups
+    rollups.discard_pending(db, project_id)
+    deadlines.record_project_deleted(db, project_id)
+
+    for statement in (
+        delete(Task).where(Task.project_id == project_id),
+        delete(ProjectTag).where(ProjectTag.project_id == project_id),
+        delete(ProjectTaskCount).where(ProjectTaskCount.project_id == project_id),
+        delete(ProjectDailySnapshot).where(ProjectDailySnapshot.project_id == project_id),
+        delete(TaskEvent).where(TaskEvent.project_id == project_id),
+        delete(Project).where(Project.id == project_id),
+    ):
+        await db.execute(statement, execution_options={"synchronize_session": False})
+    return True
+
+
+async def _delete_task_chunk(db: AsyncSession, project_id: int, chunk_rows: int) -> int:
+    rows = (await db.execute(
+        select(Task.id, Task.status)
+        .where(Task.project_id == project_id)
+        .order_by(Task.id)
+        .limit(chunk_rows)
+    )).all()
+    if rows:
+        status_counts = StatusCounts(status for _, status in rows).items()
+        counters.record_bulk_deleted(db, "tasks", status_counts)
+        rollups.record_tasks_removed(db, project_id, status_counts)
+        for task_id, _ in rows:
+            deadlines.record_task_deleted(db, task_id)
+        await db.execute(
+            delete(Task).where(Task.id.in_([task_id for task_id, _ in rows])),
+            execution_options={"synchronize_session": False},
+        )
+    return len(rows)
+
+
+async def _delete_event_chunk(db: AsyncSession, project_id: int, chunk_rows: int) -> int:
+    event_ids = (await db.scalars(
+        select(TaskEvent.id).where(TaskEvent.project_id == project_id).order_by(TaskEvent.id).limit(chunk_rows)
+    )).all()
+    if event_ids:
+        await db.execute(delete(TaskEvent).where(TaskEvent.id.in_(event_ids)),
+                         execution_options={"synchronize_session": False})
+    return len(event_ids)
+
+
+async def _delete_in_chunks(project_id: int, chunk_rows: int) -> None:
+    # Each chunk is its own write-queue transaction, so the write lock is
+    # released between chunks and other writes interleave with them
+    while await write_queue.submit(lambda db: _delete_task_chunk(db, project_id, chunk_rows)) == chunk_rows:
+        pass
+    # A project's history may hold several events per task
+    while await write_queue.submit(lambda db: _delete_event_chunk(db, project_id, chunk_rows)) == chunk_rows:
+        pass
+    # Tasks added meanwhile go with the project in the last transaction
+    if await write_queue.submit(lambda db: delete_project_rows(db, project_id)):
+        change_feed.publish(project_id, "project.deleted", {"id": project_id})
+
+
+def _finished(project_id: int, task: "asyncio.Task[None]") -> None:
+    _running.pop(project_id, None)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background deletion of project %s failed", project_id, exc_info=task.exception())
+
+
+def start_background_delete(project_id: int, chunk_rows: int = config.PROJECT_DELETE_CHUNK_ROWS) -> None:
+    """
+    Delete a large project's tasks `chunk_rows` at a time, then the
+    project itself. Starting it again while it runs does nothing.
+    """
+    if project_id in _running:
+        return
+    task = asyncio.get_running_loop().create_task(_delete_in_chunks(project_id, chunk_rows))
+    _running[project_id] = task
+    task.add_done_callback(lambda done: _finished(project_id, done))
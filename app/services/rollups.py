@@ -0,0 +1,419 @@
+"""
+Per-project task rollups and burndown history.
+
+Every task write adjusts the project's counts in project_task_counts
+("total" and "status.<status>", like the global counters) and appends to
+task_events when a task enters, leaves or changes status in a project.
+Both are recorded on the session and written when it commits, inside the
+same transaction as the write. The overdue count depends on the clock,
+so it is counted when read, from ix_tasks_project_due_status.
+
+The compaction job folds task_events into one row per project, count and
+day (project_daily_snapshots), so burndown and velocity charts read at
+most a row per day instead of replaying history. Compacted events older
+than TASK_EVENT_RETENTION_DAYS are pruned. It runs every
+ROLLUP_COMPACT_INTERVAL_SECONDS in each worker, batches are claimed with
+a compare-and-set on their watermark, or on demand:
+
+    python -m app.services.rollups
+"""
+import asyncio
+import logging
+from collections import Counter as Deltas
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, event, func, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models.counter import Counter
+from app.models.rollup import ProjectDailySnapshot, ProjectTaskCount, TaskEvent
+from app.models.task import Task
+from app.services import bulk, counters
+from app.write_queue import write_queue
+
+logger = logging.getLogger(__name__)
+
+# Session.info keys holding what the current transaction recorded
+PENDING_COUNTS = "rollup_deltas"
+PENDING_EVENTS = "task_events"
+
+DONE_STATUS = "done"
+# Counter holding the ID of the last compacted event
+WATERMARK = "compaction.task_events"
+
+# Event kinds after which the task is (not) in the project
+ARRIVALS = ("created", "moved_in")
+DEPARTURES = ("deleted", "moved_out")
+
+
+def task_deltas(old_status: Optional[str], new_status: Optional[str],
+                exists_before: bool = True, exists_after: bool = True) -> Deltas:
+    """Count adjustments of one project, keyed "total" and "status.<status>"."""
+    deltas = counters.status_deltas("tasks", old_status, new_status, exists_before, exists_after)
+    return Deltas({name.partition(".")[2]: value for name, value in deltas.items()})
+
+
+def _record(db, project_id: Optional[int], task_id: int, kind: str,
+            old_status: Optional[str], new_status: Optional[str]) -> None:
+    if project_id is None:
+        return
+    pending = db.info.setdefault(PENDING_COUNTS, Deltas())
+    for name, value in task_deltas(old_status, new_status, kind not in ARRIVALS, kind not in DEPARTURES).items():
+        pending[(project_id, name)] += value
+    db.info.setdefault(PENDING_EVENTS, []).append({
+        "project_id": project_id, "task_id": task_id, "kind": kind,
+        "from_status": old_status, "to_status": new_status, "occurred_at": datetime.utcnow(),
+    })
+
+
+def record_task_created(db, task_id: int, project_id: Optional[int], status: Optional[str]) -> None:
+    _record(db, project_id, task_id, "created", None, status)
+
+
+def record_task_deleted(db, task_id: int, project_id: Optional[int], status: Optional[str]) -> None:
+    _record(db, project_id, task_id, "deleted", status, None)
+
+
+def record_task_changed(db, task_id: int, old_project_id: Optional[int], old_status: Optional[str],
+                        new_project_id: Optional[int], new_status: Optional[str]) -> None:
+    if old_project_id != new_project_id:
+        _record(db, old_project_id, task_id, "moved_out", old_status, None)
+        _record(db, new_project_id, task_id, "moved_in", None, new_status)
+    elif old_status != new_status:
+        _record(db, new_project_id, task_id, "changed", old_status, new_status)
+
+
+def record_tasks_removed(db, project_id: int, status_counts: Iterable[Tuple[Optional[str], int]]) -> None:
+    """Count down tasks deleted with their project; no events, as its history goes too."""
+    pending = db.info.setdefault(PENDING_COUNTS, Deltas())
+    for status, count in status_counts:
+        for name, value in task_deltas(status, None, exists_after=False).items():
+            pending[(project_id, name)] += value * count
+
+
+def discard_pending(db, project_id: int) -> None:
+    """Drop what this transaction recorded for a project it deletes."""
+    pending = db.info.get(PENDING_COUNTS)
+    if pending:
+        for key in [key for key in pending if key[0] == project_id]:
+            del pending[key]
+    if db.info.get(PENDING_EVENTS):
+        db.info[PENDING_EVENTS] = [row for row in db.info[PENDING_EVENTS] if row["project_id"] != project_id]
+
+
+def _dialect(session):
+    return postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_rollups(session: Session) -> None:
+    # Flushed first so that the tasks the events point at exist
+    session.flush()
+    pending = session.info.pop(PENDING_COUNTS, None)
+    events = session.info.pop(PENDING_EVENTS, None)
+    params = [
+        {"project_id": project_id, "name": name, "value": value}
+        for (project_id, name), value in (pending or {}).items() if value
+    ]
+    if params:
+        stmt = _dialect(session).insert(ProjectTaskCount)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProjectTaskCount.project_id, ProjectTaskCount.name],
+            set_={"value": ProjectTaskCount.value + stmt.excluded.value},
+        )
+        session.execute(stmt, params)
+    if events:
+        session.execute(insert(TaskEvent), events, execution_options=bulk.INSERT_OPTIONS)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_rollups(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING_COUNTS, None)
+    session.info.pop(PENDING_EVENTS, None)
+
+
+def progress(values: Dict[str, int], overdue: int = 0) -> dict:
+    """A ProjectProgress from a project's counts."""
+    total = values.get("total", 0)
+    by_status = {
+        name[len("status."):]: value
+        for name, value in values.items() if name.startswith("status.") and value
+    }
+    done = by_status.get(DONE_STATUS, 0)
+    return {
+        "total": total,
+        "done": done,
+        "percent_done": round(done * 100 / total, 1) if total else 0.0,
+        "overdue": overdue,
+        "by_status": by_status,
+    }
+
+
+async def load_counts(db: AsyncSession, project_ids: Sequence[int]) -> Dict[int, Dict[str, int]]:
+    counts: Dict[int, Dict[str, int]] = {project_id: {} for project_id in project_ids}
+    if project_ids:
+        rows = await db.execute(
+            select(ProjectTaskCount.project_id, ProjectTaskCount.name, ProjectTaskCount.value)
+            .where(ProjectTaskCount.project_id.in_(project_ids))
+        )
+        for project_id, name, value in rows:
+            counts[project_id][name] = value
+    return counts
+
+
+async def load_progress(db: AsyncSession, project_ids: Sequence[int]) -> Dict[int, dict]:
+    """Progress of each project: two queries however many projects."""
+    counts = await load_counts(db, project_ids)
+    overdue: Dict[int, int] = {}
+    if project_ids:
+        rows = await db.execute(
+            select(Task.project_id, func.count())
+            .where(Task.project_id.in_(project_ids), Task.due_date < datetime.utcnow(),
+                   Task.status.is_distinct_from(DONE_STATUS))
+            .group_by(Task.project_id)
+        )
+        overdue = dict(rows.all())
+    return {project_id: progress(counts[project_id], overdue.get(project_id, 0)) for project_id in project_ids}
+
+
+async def next_due(db: AsyncSession, project_id: Optional[int] = None) -> Optional[datetime]:
+    """
+    The next due date to pass, after which an overdue count may change:
+    validators that cover progress include it.
+    """
+    query = select(func.min(Task.due_date)).where(Task.due_date >= datetime.utcnow())
+    if project_id is not None:
+        query = query.where(Task.project_id == project_id)
+    return await db.scalar(query)
+
+
+class CompactionConflict(Exception):
+    """Another worker compacted the same events first."""
+
+
+async def _latest_before(db: AsyncSession, project_id: int, day: date,
+                         names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """The value of each count at the end of the last snapshot day before `day`."""
+    latest = (
+        select(ProjectDailySnapshot.name, func.max(ProjectDailySnapshot.day))
+        .where(ProjectDailySnapshot.project_id == project_id, ProjectDailySnapshot.day < day)
+        .group_by(ProjectDailySnapshot.name)
+    )
+    if names is not None:
+        latest = latest.where(ProjectDailySnapshot.name.in_(list(names)))
+    rows = await db.execute(
+        select(ProjectDailySnapshot.name, ProjectDailySnapshot.value)
+        .where(ProjectDailySnapshot.project_id == project_id,
+               tuple_(ProjectDailySnapshot.name, ProjectDailySnapshot.day).in_(latest))
+    )
+    return dict(rows.all())
+
+
+async def _merge_snapshots(db: AsyncSession, project_id: int,
+                           changes: Dict[str, Dict[date, List[int]]]) -> List[dict]:
+    """
+    Snapshot rows of one project after adding `changes` ({name: {day:
+    [delta, entered]}}). A delta also moves every later day's value, so
+    events may arrive for a day that already has later snapshots.
+    """
+    first = min(day for days in changes.values() for day in days)
+    existing = {
+        (name, day): (value, entered)
+        for name, day, value, entered in await db.execute(
+            select(ProjectDailySnapshot.name, ProjectDailySnapshot.day,
+                   ProjectDailySnapshot.value, ProjectDailySnapshot.entered)
+            .where(ProjectDailySnapshot.project_id == project_id,
+                   ProjectDailySnapshot.name.in_(list(changes)),
+                   ProjectDailySnapshot.day >= first)
+        )
+    }
+    base = await _latest_before(db, project_id, first, changes)
+
+    rows = []
+    for name, days in changes.items():
+        previous = base.get(name, 0)
+        cumulative = 0
+        for day in sorted(set(days) | {day for key, day in existing if key == name}):
+            delta, entered = days.get(day, (0, 0))
+            cumulative += delta
+            old = existing.get((name, day))
+            if old is not None:
+                previous = old[0]
+            elif not delta and not entered:
+                continue
+            if old is None or cumulative or entered:
+                rows.append({
+                    "project_id": project_id, "name": name, "day": day,
+                    "value": previous + cumulative, "entered": (old[1] if old else 0) + entered,
+                })
+    return rows
+
+
+async def compact_events(db: AsyncSession, batch_rows: int = config.TASK_EVENT_BATCH_ROWS) -> int:
+    """
+    Fold the next `batch_rows` events into the daily snapshots and move
+    the watermark past them. Returns how many events were compacted. Run
+    it in a write transaction; CompactionConflict means another worker
+    compacted them and the transaction must be rolled back.
+    """
+    dialect = _dialect(db)
+    await db.execute(dialect.insert(Counter).values(name=WATERMARK, value=0).on_conflict_do_nothing())
+    watermark = await db.scalar(select(Counter.value).where(Counter.name == WATERMARK))
+    events = (await db.execute(
+        select(TaskEvent.id, TaskEvent.project_id, TaskEvent.kind, TaskEvent.from_status,
+               TaskEvent.to_status, TaskEvent.occurred_at)
+        .where(TaskEvent.id > watermark)
+        .order_by(TaskEvent.id)
+        .limit(batch_rows)
+    )).all()
+    if not events:
+        return 0
+
+    changes: Dict[int, Dict[str, Dict[date, List[int]]]] = {}
+    for event_row in events:
+        day = event_row.occurred_at.date()
+        names = changes.setdefault(event_row.project_id, {})
+        deltas = task_deltas(event_row.from_status, event_row.to_status,
+                             event_row.kind not in ARRIVALS, event_row.kind not in DEPARTURES)
+        for name, value in deltas.items():
+            if value:
+                names.setdefault(name, {}).setdefault(day, [0, 0])[0] += value
+        if event_row.kind == "changed" and event_row.to_status is not None:
+            names.setdefault(f"status.{event_row.to_status}", {}).setdefault(day, [0, 0])[1] += 1
+
+    rows = []
+    for project_id, names in changes.items():
+        if names:
+            rows.extend(await _merge_snapshots(db, project_id, names))
+    if rows:
+        stmt = dialect.insert(ProjectDailySnapshot)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProjectDailySnapshot.project_id, ProjectDailySnapshot.name, ProjectDailySnapshot.day],
+            set_={"value": stmt.excluded.value, "entered": stmt.excluded.entered},
+        )
+        await db.execute(stmt, rows)
+
+    claimed = await db.execute(
+        update(Counter)
+        .where(Counter.name == WATERMARK, Counter.value == watermark)
+        .values(value=events[-1].id),
+        execution_options={"synchronize_session": False},
+    )
+    if claimed.rowcount != 1:
+        raise CompactionConflict()
+    return len(events)
+
+
+async def compacted_through(db: AsyncSession) -> int:
+    """ID of the last compacted event; 0 before the first compaction."""
+    return await db.scalar(select(Counter.value).where(Counter.name == WATERMARK)) or 0
+
+
+async def prune_events(db: AsyncSession, retention_days: int = config.TASK_EVENT_RETENTION_DAYS) -> None:
+    """Delete compacted events older than `retention_days` (0 keeps them)."""
+    if retention_days <= 0:
+        return
+    watermark = select(Counter.value).where(Counter.name == WATERMARK).scalar_subquery()
+    await db.execute(
+        delete(TaskEvent).where(
+            TaskEvent.occurred_at < datetime.utcnow() - timedelta(days=retention_days),
+            TaskEvent.id <= watermark,
+        ),
+        execution_options={"synchronize_session": False},
+    )
+
+
+async def compact_pending(batch_rows: int = config.TASK_EVENT_BATCH_ROWS) -> int:
+    """
+    Compact every pending event, a batch per write-queue transaction, then
+    prune. Returns how many events were compacted.
+    """
+    compacted = 0
+    while True:
+        try:
+            count = await write_queue.submit(lambda db: compact_events(db, batch_rows))
+        except CompactionConflict:
+            break
+        compacted += count
+        if count < batch_rows:
+            break
+    await write_queue.submit(prune_events)
+    return compacted
+
+
+_compactor: Optional["asyncio.Task[None]"] = None
+
+
+async def _compact_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await compact_pending()
+        except Exception:
+            logger.exception("Task event compaction failed")
+
+
+def start_compaction(interval: float = config.ROLLUP_COMPACT_INTERVAL_SECONDS) -> None:
+    """Compact every `interval` seconds until stop_compaction(); 0 disables it."""
+    global _compactor
+    if interval > 0 and (_compactor is None or _compactor.done()):
+        _compactor = asyncio.get_running_loop().create_task(_compact_periodically(interval))
+
+
+async def stop_compaction() -> None:
+    global _compactor
+    if _compactor is not None:
+        _compactor.cancel()
+        try:
+            await _compactor
+        except asyncio.CancelledError:
+            pass
+        _compactor = None
+
+
+async def load_burndown(db: AsyncSession, project_id: int, days: int) -> List[dict]:
+    """
+    One BurndownDay per day of the last `days` days, oldest first, read
+    from the snapshots. Today's counts are the live rollup; its completed
+    count trails by up to one compaction interval.
+    """
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    values = await _latest_before(db, project_id, start)
+    by_day: Dict[date, list] = {}
+    rows = await db.execute(
+        select(ProjectDailySnapshot.day, ProjectDailySnapshot.name,
+               ProjectDailySnapshot.value, ProjectDailySnapshot.entered)
+        .where(ProjectDailySnapshot.project_id == project_id, ProjectDailySnapshot.day >= start)
+    )
+    for day, name, value, entered in rows:
+        by_day.setdefault(day, []).append((name, value, entered))
+    live = (await load_counts(db, [project_id]))[project_id]
+
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        entered = {}
+        for name, value, day_entered in by_day.get(day, ()):
+            values[name] = value
+            entered[name] = day_entered
+        if day == today:
+            values = live
+        point = progress(values)
+        series.append({
+            "date": day,
+            "total": point["total"],
+            "done": point["done"],
+            "remaining": point["total"] - point["done"],
+            "completed": entered.get(f"status.{DONE_STATUS}", 0),
+            "by_status": point["by_status"],
+        })
+    return series
+
+
+if __name__ == "__main__":
+    print(f"Compacted {asyncio.run(compact_pending())} task events")
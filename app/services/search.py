@@ -0,0 +1,130 @@
+import re
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.search import PROJECTS_TSVECTOR, TASKS_TSVECTOR
+
+# Column weights for bm25(): a hit in the name/title counts far more than a
+# hit in the description.
+PROJECT_WEIGHTS = "10.0, 2.0, 1.0, 4.0"  # name, description, status, tags
+TASK_WEIGHTS = "10.0, 2.0, 1.0"  # title, description, status
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so "des rev" matches
+    "design review" and user input can never inject FTS5 syntax.
+    """
+    tokens = _TOKEN_RE.findall(query)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def build_tsquery(query: str) -> str:
+    """The PostgreSQL to_tsquery() counterpart of build_match_query()."""
+    return " & ".join(f"{token}:*" for token in _TOKEN_RE.findall(query))
+
+
+def _is_postgres(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+_trigram: Optional[bool] = None  # whether pg_trgm is installed, once known
+
+
+async def _has_trigram(db: AsyncSession) -> bool:
+    global _trigram
+    if _trigram is None:
+        _trigram = await db.scalar(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")) is not None
+    return _trigram
+
+
+async def _pg_search(db: AsyncSession, columns: str, table: str, vector: str, trigram_column: str,
+                     query: str, limit: int) -> List[dict]:
+    """
+    Prefix search over the GIN-indexed tsvector, ranked with ts_rank; when
+    no word matches and pg_trgm is installed, fall back to trigram
+    similarity of the name or title so that misspelt queries still find
+    something. Scores are negated to keep SQLite's lower-is-better order.
+    """
+    rows = await db.execute(
+        text(
+            f"""
+            SELECT {columns}, -ts_rank({vector}, query) AS score
+            FROM {table}, to_tsquery('simple', :match) AS query
+            WHERE {vector} @@ query
+            ORDER BY score
+            LIMIT :limit
+            """
+        ),
+        {"match": build_tsquery(query), "limit": limit},
+    )
+    results = [dict(row) for row in rows.mappings()]
+    if results or not await _has_trigram(db):
+        return results
+    rows = await db.execute(
+        text(
+            f"""
+            SELECT {columns}, -similarity({trigram_column}, :query) AS score
+            FROM {table}
+            WHERE {trigram_column} % :query
+            ORDER BY score
+            LIMIT :limit
+            """
+        ),
+        {"query": query, "limit": limit},
+    )
+    return [dict(row) for row in rows.mappings()]
+
+
+async def search_projects(db: AsyncSession, query: str, limit: int = 10) -> List[dict]:
+    match = build_match_query(query)
+    if not match:
+        return []
+    if _is_postgres(db):
+        return await _pg_search(db, "id, name, description, status, tags, created_at", "projects",
+                                PROJECTS_TSVECTOR, "name", query, limit)
+    rows = await db.execute(
+        text(
+            f"""
+            SELECT p.id, p.name, p.description, p.status, p.tags, p.created_at,
+                   bm25(projects_fts, {PROJECT_WEIGHTS}) AS score
+            FROM projects_fts
+            JOIN projects AS p ON p.id = projects_fts.rowid
+            WHERE projects_fts MATCH :match
+            ORDER BY score
+            LIMIT :limit
+            """
+        ),
+        {"match": match, "limit": limit},
+    )
+    return [dict(row) for row in rows.mappings()]
+
+
+async def search_tasks(db: AsyncSession, query: str, limit: int = 10) -> List[dict]:
+    match = build_match_query(query)
+    if not match:
+        return []
+    if _is_postgres(db):
+        return await _pg_search(db, "id, title, description, status, priority, project_id", "tasks",
+                                TASKS_TSVECTOR, "title", query, limit)
+    rows = await db.execute(
+        text(
+            f"""
+            SELECT t.id, t.title, t.description, t.status, t.priority, t.project_id,
+                   bm25(tasks_fts, {TASK_WEIGHTS}) AS score
+            FROM tasks_fts
+            JOIN tasks AS t ON t.id = tasks_fts.rowid
+            WHERE tasks_fts MATCH :match
+            ORDER BY score
+            LIMIT :limit
+            """
+        ),
+        {"match": match, "limit": limit},
+    )
+    return [dict(row) for row in rows.mappings()]
@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, List, Literal, Optional
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, attributes
+
+from app.models.project import Project
+from app.models.tag import ProjectTag, Tag
+
+TagMatch = Literal["all", "any"]
+
+
+def normalize_tags(value: Optional[str]) -> List[str]:
+    """
+    Split a comma-separated tags string into distinct tag names, trimmed
+    and lowercased so that "Backend, api" and "api,backend" match alike.
+    """
+    names = (part.strip().lower() for part in (value or "").split(","))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def sync_project_tags(session: Session, tags_by_project: Dict[int, Optional[str]]) -> None:
+    """
+    Rewrite the tag links of the given projects from their tags strings
+    with set-based statements: one DELETE of the old links, one upsert of
+    new tag names, one SELECT of their IDs and one INSERT of the links.
+    """
+    if not tags_by_project:
+        return
+    session.execute(
+        delete(ProjectTag).where(ProjectTag.project_id.in_(list(tags_by_project))),
+        execution_options={"synchronize_session": False},
+    )
+    names_by_project = {project_id: normalize_tags(value) for project_id, value in tags_by_project.items()}
+    names = {name for project_names in names_by_project.values() for name in project_names}
+    if not names:
+        return
+
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    session.execute(
+        dialect.insert(Tag).on_conflict_do_nothing(index_elements=[Tag.name]),
+        [{"name": name} for name in names],
+    )
+    tag_ids = dict(session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+    session.execute(insert(ProjectTag), [
+        {"project_id": project_id, "tag_id": tag_ids[name]}
+        for project_id, project_names in names_by_project.items()
+        for name in project_names
+    ])
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_flushed_projects(session: Session, flush_context) -> None:
+    # New and dirty lists and attribute history still describe the flush
+    # that just ran, and new projects now have their IDs
+    changed = {
+        obj.id: obj.tags
+        for obj in session.new | session.dirty
+        if isinstance(obj, Project)
+        and (obj in session.new or attributes.get_history(obj, "tags").has_changes())
+    }
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Project)]
+    if deleted:
+        # Also cascaded by the foreign key where the database enforces it
+        session.execute(
+            delete(ProjectTag).where(ProjectTag.project_id.in_(deleted)),
+            execution_options={"synchronize_session": False},
+        )
+    sync_project_tags(session, changed)
+
+
+def filter_projects(query, names: Iterable[str], match: TagMatch = "all"):
+    """
+    Restrict a projects query to those tagged with all (or any) of `names`.
+    The tag names resolve through the unique index on tags.name and each
+    tag's projects through ix_project_tags_tag_project.
+    """
+    names = list(dict.fromkeys(name for value in names for name in normalize_tags(value)))
+    if not names:
+        return query
+    tagged = (
+        select(ProjectTag.project_id)
+        .join(Tag, Tag.id == ProjectTag.tag_id)
+        .where(Tag.name.in_(names))
+    )
+    if match == "all":
+        tagged = tagged.group_by(ProjectTag.project_id).having(func.count() == len(names))
+    return query.where(Project.id.in_(tagged))
+
+
+async def tag_counts(db: AsyncSession, limit: int) -> List[Row]:
+    """The most used tags as (name, count) rows, count being their projects."""
+    count = func.count(ProjectTag.project_id).label("count")
+    return (await db.execute(
+        select(Tag.name, count)
+        .join(ProjectTag, ProjectTag.tag_id == Tag.id)
+        .group_by(Tag.id, Tag.name)
+        .order_by(count.desc(), Tag.name)
+        .limit(limit)
+    )).all()
@@ -0,0 +1,156 @@
+from collections import Counter as Deltas
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import USE_WRITER
+from app.models.task import Task
+from app.schemas.task import Task as TaskSchema
+from app.schemas.task import TaskBatch, TaskBatchItem
+from app.services import bulk, counters, deadlines, rollups
+from app.services.events import change_feed
+
+
+async def apply_batch(db: AsyncSession, batch: TaskBatch) -> List[TaskBatchItem]:
+    """
+    Apply every create, update and delete of `batch` with set-based
+    statements and commit once.
+
+    Whatever the size of the batch this is one SELECT of the rows touched,
+    one multi-row INSERT ... RETURNING, one executemany UPDATE, one
+    DELETE ... RETURNING, one SELECT of the updated rows and the counter,
+    rollup and task event writes at commit.
+    Change events are published per task once the batch has committed.
+    Updates and deletes of unknown IDs are reported per item and do not
+    fail the rest of the batch. Operations apply creates first, then
+    updates, then deletes.
+    """
+    created_results: List[TaskBatchItem] = []
+    update_results: List[TaskBatchItem] = []
+    delete_results: List[TaskBatchItem] = []
+    deltas = Deltas()
+
+    # Current status and project of every referenced task, for counters,
+    # 404s and routing change events. Read and locked in the write
+    # transaction, so that a concurrent batch cannot count the same change.
+    ids = {item.id for item in batch.update} | set(batch.delete)
+    statuses: Dict[int, Optional[str]] = {}
+    project_ids: Dict[int, int] = {}
+    if ids:
+        db.info[USE_WRITER] = True
+        rows = await db.execute(
+            select(Task.id, Task.status, Task.project_id).where(Task.id.in_(ids)).with_for_update()
+        )
+        for task_id, status, project_id in rows:
+            statuses[task_id] = status
+            project_ids[task_id] = project_id
+    # Where each task is as the batch goes on; project_ids keeps the original
+    current_project_ids = dict(project_ids)
+
+    if batch.create:
+        created = []
+        for group in bulk.insert_rows(Task, (item.model_dump() for item in batch.create)):
+            inserted = await db.execute(insert(Task).returning(*Task.__table__.c), group,
+                                        execution_options=bulk.INSERT_OPTIONS)
+            created.extend(inserted.all())
+        # RETURNING order is unspecified, but rows are inserted in VALUES
+        # order so their IDs are ascending. (Asking SQLAlchemy to sort by
+        # parameter order makes SQLite insert one row per statement.)
+        for index, task in enumerate(sorted(created, key=lambda task: task.id)):
+            deltas.update(counters.status_deltas("tasks", None, task.status, exists_before=False))
+            rollups.record_task_created(db, task.id, task.project_id, task.status)
+            deadlines.record_task(db, task.id, task.project_id, task.due_date, task.status)
+            created_results.append(
+                TaskBatchItem(op="create", index=index, id=task.id, task=TaskSchema.model_validate(task))
+            )
+
+    now = datetime.utcnow()
+    update_params = []
+    updated_fields: Dict[int, set] = {}
+    for index, item in enumerate(batch.update):
+        if item.id not in statuses:
+            update_results.append(TaskBatchItem(op="update", index=index, id=item.id, ok=False, error="Task not found"))
+            continue
+        values = item.model_dump(exclude_unset=True)
+        if "status" in values:
+            deltas.update(counters.status_deltas("tasks", statuses[item.id], values["status"]))
+        new_status = values.get("status", statuses[item.id])
+        new_project_id = values.get("project_id", current_project_ids[item.id])
+        rollups.record_task_changed(db, item.id, current_project_ids[item.id], statuses[item.id],
+                                    new_project_id, new_status)
+        statuses[item.id] = new_status
+        current_project_ids[item.id] = new_project_id
+        updated_fields.setdefault(item.id, set()).update(values)
+        values["updated_at"] = now
+        update_params.append(values)
+        update_results.append(TaskBatchItem(op="update", index=index, id=item.id))
+    if update_params:
+        # ORM bulk UPDATE by primary key: rows are grouped by the columns
+        # they set and each group runs as a single executemany
+        await db.execute(update(Task), update_params)
+
+    delete_ids = []
+    for index, task_id in enumerate(batch.delete):
+        if task_id not in statuses:
+            delete_results.append(TaskBatchItem(op="delete", index=index, id=task_id, ok=False, error="Task not found"))
+            continue
+        del statuses[task_id]
+        delete_ids.append(task_id)
+        delete_results.append(TaskBatchItem(op="delete", index=index, id=task_id))
+    if delete_ids:
+        # Counted from what the DELETE removed, as for DELETE /tasks/{id}
+        deleted = await db.execute(
+            delete(Task).where(Task.id.in_(delete_ids)).returning(Task.id, Task.project_id, Task.status),
+            execution_options={"synchronize_session": False},
+        )
+        removed = set()
+        for task_id, project_id, status in deleted:
+            removed.add(task_id)
+            deltas.update(counters.status_deltas("tasks", status, None, exists_after=False))
+            rollups.record_task_deleted(db, task_id, project_id, status)
+            deadlines.record_task_deleted(db, task_id)
+        for item in delete_results:
+            if item.id not in removed:
+                item.ok = False
+                item.error = "Task not found"
+
+    # Return the final state of updated tasks that still exist
+    updated_ids = {item.id for item in update_results if item.ok and item.id in statuses}
+    if updated_ids:
+        tasks = {task.id: TaskSchema.model_validate(task) for task in (await db.scalars(
+            select(Task).where(Task.id.in_(updated_ids)).execution_options(populate_existing=True)
+        )).all()}
+        for item in update_results:
+            if item.ok:
+                item.task = tasks.get(item.id)
+        for task in tasks.values():
+            deadlines.record_task(db, task.id, task.project_id, task.due_date, task.status)
+
+    counters.apply(db, deltas)
+    await db.commit()
+    _publish_changes(created_results, update_results, delete_results, project_ids, updated_fields)
+    return created_results + update_results + delete_results
+
+
+def _publish_changes(created_results: List[TaskBatchItem], update_results: List[TaskBatchItem],
+                     delete_results: List[TaskBatchItem], project_ids: Dict[int, int],
+                     updated_fields: Dict[int, set]) -> None:
+    for item in created_results:
+        change_feed.publish(item.task.project_id, "task.created", item.task)
+    published = set()
+    for item in update_results:
+        if not item.ok or item.task is None or item.id in published:
+            continue
+        published.add(item.id)
+        task = item.task
+        if task.project_id != project_ids[item.id]:
+            change_feed.publish(project_ids[item.id], "task.deleted", {"id": task.id})
+            change_feed.publish(task.project_id, "task.created", task)
+        else:
+            fields = updated_fields[item.id] | {"id", "updated_at"}
+            change_feed.publish(task.project_id, "task.updated", task.model_dump(include=fields))
+    for item in delete_results:
+        if item.ok:
+            change_feed.publish(project_ids[item.id], "task.deleted", {"id": item.id})
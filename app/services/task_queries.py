@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional, Sequence, Tuple
+
+from sqlalchemy import select, tuple_, union_all
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task
+from app.services.pagination import decode_cursor, decode_cursor_keys, encode_cursor
+
+TaskSort = Literal["id", "due_date"]
+# Columns a page must select for its order and next cursor
+SORT_KEYS = {"id": ("id",), "due_date": ("due_date", "id")}
+# Statuses of a work queue unless the caller asks for others
+OPEN_STATUSES = ("todo", "in_progress")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_micros(value: datetime) -> int:
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+@dataclass(frozen=True)
+class TaskFilters:
+    project_id: Optional[int] = None
+    assigned_to_id: Optional[int] = None
+    statuses: Sequence[str] = ()
+    priorities: Sequence[str] = ()
+    due_after: Optional[datetime] = None  # inclusive
+    due_before: Optional[datetime] = None  # exclusive
+
+    def conditions(self) -> list:
+        """Every condition except status, which is split into segments."""
+        conditions = []
+        if self.project_id:
+            conditions.append(Task.project_id == self.project_id)
+        if self.assigned_to_id is not None:
+            conditions.append(Task.assigned_to_id == self.assigned_to_id)
+        if self.priorities:
+            conditions.append(Task.priority.in_(self.priorities))
+        if self.due_after is not None:
+            conditions.append(Task.due_date >= self.due_after)
+        if self.due_before is not None:
+            conditions.append(Task.due_date < self.due_before)
+        return conditions
+
+    @property
+    def needs_due_date(self) -> bool:
+        return self.due_after is not None or self.due_before is not None
+
+
+def _segment_queries(columns: Sequence, filters: TaskFilters, sort: TaskSort,
+                     limit: int, cursor: Optional[str]) -> List:
+    """
+    One query per status (and, sorted by due date, per dated/undated
+    phase), each an index range scan already in page order, e.g. on
+    ix_tasks_assignee_status_due for a user's work queue. Merging their
+    first `limit + 1` rows gives the page without sorting every match.
+    """
+    conditions = filters.conditions()
+    statuses = list(dict.fromkeys(filters.statuses)) or [None]
+    queries = []
+    for status in statuses:
+        base = select(*columns).where(*conditions)
+        if status is not None:
+            base = base.where(Task.status == status)
+
+        if sort == "id":
+            if cursor:
+                base = base.where(Task.id > decode_cursor(cursor))
+            queries.append(base.order_by(Task.id))
+            continue
+
+        # Tasks with a due date first, earliest first, then undated ones by ID
+        dated, due, after_id = decode_cursor_keys(cursor, "dated", "due", "id") if cursor else (1, None, 0)
+        if dated:
+            dated_query = base.where(Task.due_date.isnot(None))
+            if cursor:
+                dated_query = dated_query.where(tuple_(Task.due_date, Task.id) > tuple_(from_micros(due), after_id))
+            queries.append(dated_query.order_by(Task.due_date, Task.id))
+        if not filters.needs_due_date:
+            undated_query = base.where(Task.due_date.is_(None))
+            if not dated:
+                undated_query = undated_query.where(Task.id > after_id)
+            queries.append(undated_query.order_by(Task.id))
+    return [query.limit(limit + 1) for query in queries]
+
+
+def _order_by(columns, sort: TaskSort) -> tuple:
+    """ORDER BY of merged segments with columns `columns`, in page order."""
+    if sort == "id":
+        return (columns.id,)
+    return columns.due_date.is_(None), columns.due_date, columns.id
+
+
+def _sort_key(sort: TaskSort):
+    if sort == "id":
+        return lambda row: row.id
+    return lambda row: (row.due_date is None, row.due_date or _EPOCH, row.id)
+
+
+def _next_cursor(row: Row, sort: TaskSort) -> str:
+    if sort == "id":
+        return encode_cursor(row.id)
+    if row.due_date is None:
+        return encode_cursor(row.id, dated=0, due=0)
+    return encode_cursor(row.id, dated=1, due=to_micros(row.due_date))
+
+
+async def load_page(db: AsyncSession, columns: Sequence, filters: TaskFilters, sort: TaskSort,
+                    limit: int, cursor: Optional[str] = None, skip: int = 0) -> Tuple[List[Row], Optional[str]]:
+    """
+    A page of `columns` rows of the tasks matching `filters`, in `sort`
+    order, and the cursor of the next page. `skip` is only honoured
+    without a cursor; with several segments each reads `skip` more rows
+    and the offset applies to the merged rows.
+    """
+    skip = 0 if cursor else skip
+    segments = _segment_queries(columns, filters, sort, limit + skip, cursor)
+    if len(segments) == 1:
+        stmt = segments[0].limit(limit + 1).offset(skip) if skip else segments[0]
+    else:
+        # LIMIT inside a UNION member needs its own subquery
+        stmt = union_all(*(segment.subquery().select() for segment in segments))
+        if skip:
+            merged = stmt.subquery()
+            stmt = select(merged).order_by(*_order_by(merged.c, sort)).offset(skip).limit(limit + 1)
+    rows = sorted((await db.execute(stmt)).all(), key=_sort_key(sort))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, _next_cursor(rows[-1], sort)
@@ -0,0 +1,233 @@
+import codecs
+import csv
+import io
+from collections import Counter as Deltas
+from datetime import date
+from typing import AsyncIterator, List, Optional, Sequence, Set, Tuple
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Row
+
+from app.database import open_session
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.project import Project as ProjectSchema
+from app.schemas.task import Task as TaskSchema
+from app.schemas.transfer import ProjectImport, TaskImport
+from app.services import bulk, counters, deadlines, rollups, tags
+from app.services.events import change_feed
+from app.services.fast_json import schema_columns
+from app.write_queue import write_queue
+
+# entity -> (model, exported schema, import schema)
+ENTITIES = {
+    "projects": (Project, ProjectSchema, ProjectImport),
+    "tasks": (Task, TaskSchema, TaskImport),
+}
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Taken from the file only with keep_ids; otherwise the database assigns them
+PRESERVED_FIELDS = ("id", "created_at", "updated_at")
+
+
+class ImportFailed(Exception):
+    def __init__(self, line: int, message: str, imported: int = 0):
+        super().__init__(message)
+        self.line = line
+        self.message = message
+        self.imported = imported
+
+
+# --- export ---------------------------------------------------------------
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _encode(rows: Sequence[Row], keys: List[str], fmt: str) -> bytes:
+    if fmt == "ndjson":
+        return b"".join(orjson.dumps(dict(zip(keys, row))) + b"\n" for row in rows)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def export_rows(entity: str, fmt: str, chunk_rows: int) -> AsyncIterator[bytes]:
+    """
+    Stream every row of `entity` in ID order as NDJSON or CSV.
+
+    Rows come off a server-side cursor (yield_per) a chunk at a time and
+    each chunk is flushed as soon as it is encoded, so memory stays flat
+    whatever the table size. The export reads one consistent snapshot.
+    """
+    model, schema, _ = ENTITIES[entity]
+    columns = schema_columns(model, schema)
+    keys = [column.name for column in columns]
+    if fmt == "csv":
+        yield _encode([keys], keys, fmt)
+
+    async with open_session() as db:
+        result = await db.stream(select(*columns).order_by(model.id).execution_options(yield_per=chunk_rows))
+        try:
+            async for rows in result.partitions(chunk_rows):
+                yield _encode(rows, keys, fmt)
+        finally:
+            await result.close()
+
+
+# --- import ---------------------------------------------------------------
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into numbered text lines without buffering it."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_no = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_no + 1, pending.rstrip("\r")
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, dict]]:
+    """
+    Parse NDJSON objects or CSV rows (with a header line) incrementally,
+    yielding (line number, record). Empty CSV cells become None.
+    """
+    if fmt == "ndjson":
+        async for line_no, line in _iter_lines(chunks):
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError as exc:
+                raise ImportFailed(line_no, f"Invalid JSON: {exc}")
+            if not isinstance(record, dict):
+                raise ImportFailed(line_no, "Expected a JSON object")
+            yield line_no, record
+        return
+
+    header: Optional[List[str]] = None
+    record_text: Optional[str] = None
+    async for line_no, line in _iter_lines(chunks):
+        record_text = line if record_text is None else f"{record_text}\n{line}"
+        # An odd number of quotes means a quoted field continues on the next line
+        if record_text.count('"') % 2:
+            continue
+        values = next(csv.reader([record_text]), [])
+        record_text = None
+        if header is None:
+            header = values
+        elif any(values):
+            yield line_no, {key: value if value != "" else None for key, value in zip(header, values)}
+    if record_text is not None:
+        raise ImportFailed(line_no, "Unterminated quoted CSV field")
+
+
+def _row_values(entity: str, item, keep_ids: bool, owner_id: int) -> dict:
+    values = item.model_dump()
+    if not keep_ids:
+        for field in PRESERVED_FIELDS:
+            values.pop(field, None)
+    if entity == "projects" and (not keep_ids or values.get("owner_id") is None):
+        values["owner_id"] = owner_id
+    return values
+
+
+async def _write_batch(entity: str, rows: List[dict]) -> None:
+    model = ENTITIES[entity][0]
+    default_status = model.__table__.c.status.default.arg
+    groups = bulk.insert_rows(model, rows)
+    deltas = Deltas()
+    for group in groups:
+        for row in group:
+            deltas.update(counters.status_deltas(entity, None, row.get("status", default_status), exists_before=False))
+
+    async def job(db):
+        for group in groups:
+            if entity == "projects":
+                # Core inserts skip the flush hook that maintains tag links
+                inserted = await db.execute(
+                    insert(model).returning(model.id, model.tags), group, execution_options=bulk.INSERT_OPTIONS
+                )
+                await db.run_sync(tags.sync_project_tags, dict(inserted.all()))
+            else:
+                # The IDs are needed for the task events of the rollups and the deadlines
+                inserted = await db.execute(
+                    insert(model).returning(model.id, model.project_id, model.status, model.due_date),
+                    group, execution_options=bulk.INSERT_OPTIONS,
+                )
+                for task_id, project_id, status, due_date in inserted:
+                    rollups.record_task_created(db, task_id, project_id, status)
+                    deadlines.record_task(db, task_id, project_id, due_date, status)
+        counters.apply(db, deltas)
+
+    await write_queue.submit(job)
+
+
+async def _sync_sequence(entity: str) -> None:
+    """After inserting explicit IDs, move a PostgreSQL sequence past them."""
+    async def job(db):
+        if db.get_bind().dialect.name == "postgresql":
+            await db.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{entity}', 'id'), COALESCE(MAX(id), 1)) FROM {entity}"
+            ))
+
+    await write_queue.submit(job)
+
+
+async def import_records(entity: str, records: AsyncIterator[Tuple[int, dict]], keep_ids: bool,
+                         owner_id: int, batch_rows: int) -> dict:
+    """
+    Validate records and insert them in batches of `batch_rows`, each one
+    transaction through the write queue. Only one batch is held in memory.
+    On the first invalid record the import stops; earlier batches stay
+    committed and ImportFailed reports how many rows they held.
+    """
+    import_schema = ENTITIES[entity][2]
+    imported = batches = 0
+    batch: List[dict] = []
+    touched_projects: Set[int] = set()
+
+    async def flush() -> None:
+        nonlocal imported, batches
+        await _write_batch(entity, batch)
+        imported += len(batch)
+        batches += 1
+        # Boards of affected projects refetch instead of replaying each row
+        for project_id in touched_projects:
+            change_feed.publish(project_id, "reset", {})
+        batch.clear()
+        touched_projects.clear()
+
+    line_no = 0
+    try:
+        async for line_no, record in records:
+            try:
+                item = import_schema.model_validate(record)
+            except ValidationError as exc:
+                raise ImportFailed(line_no, "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()
+                ))
+            batch.append(_row_values(entity, item, keep_ids, owner_id))
+            if entity == "tasks":
+                touched_projects.add(item.project_id)
+            if len(batch) >= batch_rows:
+                await flush()
+        if batch:
+            await flush()
+    except ImportFailed as exc:
+        exc.imported = imported
+        raise
+    except Exception as exc:
+        # A batch was rejected by the database (e.g. a duplicate ID). Report
+        # the driver's message, not the statement with all its parameters.
+        raise ImportFailed(line_no, f"Batch failed: {getattr(exc, 'orig', exc)}", imported)
+    if keep_ids and imported:
+        await _sync_sequence(entity)
+    return {"entity": entity, "imported": imported, "batches": batches}
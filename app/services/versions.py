@@ -0,0 +1,46 @@
+from typing import Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.models.counter import Counter
+from app.services.counters import PENDING_DELTAS, Deltas
+
+# Tables whose writes change the version of their collection
+VERSIONED_TABLES = ("projects", "tasks", "users")
+
+
+def version_key(collection: str) -> str:
+    return f"version.{collection}"
+
+
+def mark_changed(session: Session, table: Optional[str]) -> None:
+    """
+    Bump the version of `table` when the session commits. A transaction
+    raises each version by exactly one however many rows it writes.
+    """
+    if table in VERSIONED_TABLES:
+        session.info.setdefault(PENDING_DELTAS, Deltas())[version_key(table)] = 1
+
+
+@event.listens_for(Session, "before_flush")
+def _mark_flushed_changes(session: Session, flush_context, instances) -> None:
+    for obj in session.new | session.deleted:
+        mark_changed(session, getattr(obj, "__tablename__", None))
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            mark_changed(session, getattr(obj, "__tablename__", None))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_statements(orm_execute_state: ORMExecuteState) -> None:
+    # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        mark_changed(orm_execute_state.session, getattr(table, "name", None))
+
+
+async def collection_version(db: AsyncSession, collection: str) -> int:
+    """Current version of a collection; 0 until its first write."""
+    return await db.scalar(select(Counter.value).where(Counter.name == version_key(collection))) or 0
@@ -0,0 +1,83 @@
+"""
+Single-statement writes of one row for the create and update endpoints.
+
+The row comes back from INSERT/UPDATE ... RETURNING, so a write is not
+followed by a SELECT of what it just wrote, and an update neither loads
+the row beforehand nor needs it to report a missing ID. The results are
+Core rows with every column of the table, not ORM objects: they are not
+expired by the commit and validate into the response schemas as they
+are. Statements are ORM-enabled, so collection versions still change
+(see versions.py), but flush hooks such as the tag sync do not run.
+"""
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import USE_WRITER
+from app.services import bulk
+
+# Execution options of by-ID UPDATEs and DELETEs: the statement returns
+# what it changed, so the session has nothing to synchronize
+UPDATE_OPTIONS = {"synchronize_session": False}
+
+
+def _is_postgres(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+async def insert_returning(db: AsyncSession, model, values: dict, skip_conflicts: bool = False) -> Optional[Row]:
+    """
+    INSERT one row, None values taking the column defaults as for an ORM
+    add, and return it. With `skip_conflicts` a row that would violate a
+    unique constraint is not inserted and None is returned instead.
+    """
+    if skip_conflicts:
+        stmt = (postgresql if _is_postgres(db) else sqlite).insert(model).on_conflict_do_nothing()
+    else:
+        stmt = insert(model)
+    stmt = stmt.values(bulk.insert_row(model, values)).returning(*model.__table__.c)
+    return (await db.execute(stmt)).first()
+
+
+async def update_returning(db: AsyncSession, model, ident: int, values: Dict[str, Any],
+                           previous: Sequence[str] = ()) -> Optional[Tuple[Row, Dict[str, Any]]]:
+    """
+    UPDATE the row with ID `ident` and return it together with the values
+    the `previous` columns had before, e.g. an old status for counters;
+    None when there is no such row.
+
+    This is one statement, unless `values` changes one of `previous` on
+    SQLite: its RETURNING sees only the updated row, so the old values are
+    read first, in the same write transaction. PostgreSQL returns them
+    from a locked snapshot of the row joined into the UPDATE. Empty
+    `values` only read the row, as an unchanged ORM object is not flushed.
+    """
+    table = model.__table__
+    changed = [name for name in previous if name in values]
+    if not values:
+        row = (await db.execute(select(*table.c).where(model.id == ident))).first()
+        return None if row is None else (row, {name: getattr(row, name) for name in previous})
+
+    stmt = update(model).values(values).returning(*table.c)
+    old: Dict[str, Any] = {}
+    if changed and _is_postgres(db):
+        prior = select(model.id, *(table.c[name] for name in changed)).where(model.id == ident)
+        prior = prior.with_for_update().cte("prior")
+        stmt = stmt.where(model.id == prior.c.id).returning(*(prior.c[name].label(f"old_{name}") for name in changed))
+        row = (await db.execute(stmt, execution_options=UPDATE_OPTIONS)).first()
+        if row is not None:
+            old = {name: getattr(row, f"old_{name}") for name in changed}
+    else:
+        if changed:
+            db.info[USE_WRITER] = True
+            current = (await db.execute(select(*(table.c[name] for name in changed)).where(model.id == ident))).first()
+            if current is None:
+                return None
+            old = dict(current._mapping)
+        row = (await db.execute(stmt.where(model.id == ident), execution_options=UPDATE_OPTIONS)).first()
+    if row is None:
+        return None
+    return row, {name: old[name] if name in old else getattr(row, name) for name in previous}
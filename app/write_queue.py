@@ -0,0 +1,97 @@
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from app import config, metrics
+from app.database import USE_WRITER, open_session
+
+WriteJob = Callable[[Any], Awaitable[Any]]
+
+
+class WriteQueue:
+    """
+    Serializes write jobs through one asyncio task and commits whatever
+    is queued at that moment together (group commit).
+
+    A job is `async def job(db) -> result`. Each job runs in its own
+    SAVEPOINT, so a failing job rolls back alone and its exception is
+    raised to its submitter while the rest of the batch still commits.
+    Use it for write work that is not tied to a request's own session,
+    such as bulk imports and background deletes: many small commits
+    become one, and they never compete with each other for the lock.
+    """
+
+    def __init__(self, max_batch: int):
+        self.max_batch = max_batch
+        self.batches = 0
+        self.jobs = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, job: WriteJob) -> Any:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((job, future, metrics.current_stats()))
+        return await future
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        # The task inherited the context of the request that started it
+        metrics.attribute_to(None)
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._apply(batch)
+
+    async def _apply(self, batch: List[Tuple[WriteJob, asyncio.Future, Any]]) -> None:
+        outcomes = []
+        try:
+            async with open_session() as db:
+                db.info[USE_WRITER] = True
+                for job, future, stats in batch:
+                    # Count the job's SQL towards the request that queued it
+                    stats_token = metrics.attribute_to(stats)
+                    # Pending side effects (e.g. counter deltas) live in
+                    # session.info; drop the failed job's share of them.
+                    saved_info = {key: copy.copy(value) for key, value in db.info.items()}
+                    try:
+                        async with db.begin_nested():
+                            outcomes.append((future, None, await job(db)))
+                    except Exception as exc:
+                        db.info.clear()
+                        db.info.update(saved_info)
+                        outcomes.append((future, exc, None))
+                    finally:
+                        metrics.reset_attribution(stats_token)
+                await db.commit()
+        except Exception as exc:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.jobs += len(batch)
+        for future, exc, result in outcomes:
+            if future.done():
+                continue
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+
+write_queue = WriteQueue(config.WRITE_QUEUE_MAX_BATCH)
@@ -0,0 +1,84 @@
+"""
+Compare two result files written by benchmarks.load.
+
+Prints throughput and latency percentiles side by side for every
+scenario present in both runs, and exits with status 1 when a scenario
+regressed by more than --threshold percent (throughput down, or p95
+latency up), so it can gate a CI job:
+
+    python -m benchmarks.compare before.json after.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from typing import List, Tuple
+
+# (label, path in a scenario result, whether higher is better)
+METRICS = [
+    ("rps", ("throughput_rps",), True),
+    ("p50 ms", ("latency_ms", "p50"), False),
+    ("p95 ms", ("latency_ms", "p95"), False),
+    ("p99 ms", ("latency_ms", "p99"), False),
+]
+# Metrics that decide a regression; p99 is too noisy on short runs
+GATED = {"rps", "p95 ms"}
+
+
+def _get(result: dict, path: Tuple[str, ...]) -> float:
+    for key in path:
+        result = result[key]
+    return result
+
+
+def _change(old: float, new: float) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(before: dict, after: dict, threshold: float) -> Tuple[List[str], List[str]]:
+    lines = []
+    regressions = []
+    for name in before["results"]:
+        if name not in after["results"]:
+            continue
+        old, new = before["results"][name], after["results"][name]
+        cells = []
+        for label, path, higher_is_better in METRICS:
+            old_value, new_value = _get(old, path), _get(new, path)
+            change = _change(old_value, new_value)
+            cells.append(f"{label} {old_value:g} -> {new_value:g} ({change:+.1f}%)")
+            worse = -change if higher_is_better else change
+            if label in GATED and worse > threshold:
+                regressions.append(f"{name}: {label} {change:+.1f}%")
+        if new.get("errors") and not old.get("errors"):
+            regressions.append(f"{name}: {new['errors']} errors")
+        lines.append(f"{name:<16} " + " | ".join(cells))
+    return lines, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    for key in ("mode", "workers", "concurrency", "dataset", "database"):
+        if before["meta"].get(key) != after["meta"].get(key):
+            print(f"warning: runs differ in {key}: {before['meta'].get(key)} vs {after['meta'].get(key)}")
+
+    lines, regressions = compare(before, after, args.threshold)
+    print(f"{before['meta'].get('commit')} -> {after['meta'].get('commit')}")
+    print("\n".join(lines))
+    if regressions:
+        print(f"\nRegressions over {args.threshold:g}%:")
+        print("\n".join(f"  {line}" for line in regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Seed a database with a synthetic dataset for benchmarks.
+
+Rows are written with bulk INSERT statements against the models in
+app/models, a batch per transaction, and the counters, collection
+versions, tag index and project rollups are kept consistent as the app
+would keep them. Every user is `user<N>` with the password `bench`. The
+data is deterministic for a given --seed.
+
+    python -m benchmarks.datagen --scale large --db /tmp/bench.db
+    python -m benchmarks.datagen --users 500 --projects 2000 --tasks 50000 --db /tmp/bench.db
+
+Scales (users / projects / tasks): small 100 / 1k / 10k, medium
+1k / 10k / 100k, large 10k / 100k / 1M. Seeding into a database that
+already has users is refused; reuse it as is instead.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter as Deltas
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List
+
+SCALES = {
+    "small": (100, 1_000, 10_000),
+    "medium": (1_000, 10_000, 100_000),
+    "large": (10_000, 100_000, 1_000_000),
+}
+PASSWORD = "bench"
+BATCH_ROWS = 10_000
+
+TAG_VOCABULARY = ["backend", "frontend", "api", "mobile", "infra", "design", "research", "ops", "data", "security"]
+PROJECT_STATUSES = ["planning", "active", "active", "on_hold", "completed"]
+TASK_STATUSES = ["todo", "todo", "in_progress", "done", "done", "done"]
+PRIORITIES = ["low", "medium", "medium", "high"]
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt".split()
+
+
+def _text(rng: random.Random, max_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, max_words)))
+
+
+def _user_rows(count: int, hashed_password: str) -> Iterator[dict]:
+    for i in range(1, count + 1):
+        yield {
+            "id": i,
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "full_name": f"User {i}",
+            "hashed_password": hashed_password,
+            "role": "admin" if i == 1 else "member",
+            "is_active": True,
+        }
+
+
+def _project_rows(rng: random.Random, count: int, users: int) -> Iterator[dict]:
+    today = datetime.utcnow().date()
+    for i in range(1, count + 1):
+        start = today - timedelta(days=rng.randint(0, 365))
+        yield {
+            "id": i,
+            "name": f"Project {i} {rng.choice(WORDS)}",
+            "description": _text(rng, 60),
+            "status": rng.choice(PROJECT_STATUSES),
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randint(30, 400)),
+            "tags": ",".join(rng.sample(TAG_VOCABULARY, rng.randint(0, 3))) or None,
+            "owner_id": rng.randint(1, users),
+        }
+
+
+def _task_rows(rng: random.Random, count: int, projects: int, users: int) -> Iterator[dict]:
+    now = datetime.utcnow().replace(microsecond=0)
+    for i in range(1, count + 1):
+        yield {
+            "id": i,
+            "title": f"Task {i} {rng.choice(WORDS)} {rng.choice(WORDS)}",
+            "description": _text(rng, 120),
+            "status": rng.choice(TASK_STATUSES),
+            "priority": rng.choice(PRIORITIES),
+            "due_date": now + timedelta(hours=rng.randint(-24 * 60, 24 * 60)) if rng.random() < 0.7 else None,
+            "project_id": rng.randint(1, projects),
+            "assigned_to_id": rng.randint(1, users) if rng.random() < 0.8 else None,
+        }
+
+
+def _insert_batches(db, model, rows: Iterator[dict], total: int,
+                    on_batch: Callable[[object, List[dict]], None]) -> None:
+    from sqlalchemy import insert
+
+    from app.services import bulk, counters
+
+    entity = model.__tablename__
+    batch: List[dict] = []
+    done = 0
+    started = time.perf_counter()
+
+    def flush() -> None:
+        nonlocal done
+        for group in bulk.insert_rows(model, batch):
+            db.execute(insert(model), group, execution_options=bulk.INSERT_OPTIONS)
+        on_batch(db, batch)
+        deltas = Deltas()
+        for row in batch:
+            deltas.update(counters.status_deltas(entity, None, row.get("status"), exists_before=False))
+        counters.apply(db, deltas)
+        db.commit()
+        done += len(batch)
+        rate = done / (time.perf_counter() - started)
+        print(f"\r{entity}: {done}/{total} ({rate:,.0f} rows/s)", end="", file=sys.stderr, flush=True)
+        batch.clear()
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_ROWS:
+            flush()
+    if batch:
+        flush()
+    print(file=sys.stderr)
+
+
+def seed_dataset(users: int, projects: int, tasks: int, seed: int = 0) -> Dict[str, int]:
+    """
+    Create the schema if needed and insert the dataset through the app's
+    configured database (DATABASE_URL must be set before calling).
+    """
+    from sqlalchemy import func, select, text
+
+    from app.auth.hashing import hash_password
+    from app.database import SessionLocal
+    from app.models import Project, Task, User
+    from app.schema_setup import setup_schema
+    from app.services import rollups, tags
+
+    setup_schema("create")
+    rng = random.Random(seed)
+    with SessionLocal() as db:
+        if db.scalar(select(func.count(User.id))):
+            raise SystemExit("The database already has users; seed an empty database")
+
+        def sync_tags(session, rows):
+            tags.sync_project_tags(session, {row["id"]: row["tags"] for row in rows})
+
+        def record_tasks(session, rows):
+            for row in rows:
+                rollups.record_task_created(session, row["id"], row["project_id"], row["status"])
+
+        # One hash for everyone: bcrypt per user would dominate seeding
+        _insert_batches(db, User, _user_rows(users, hash_password(PASSWORD)), users, lambda *_: None)
+        _insert_batches(db, Project, _project_rows(rng, projects, users), projects, sync_tags)
+        _insert_batches(db, Task, _task_rows(rng, tasks, projects, users), tasks, record_tasks)
+        if db.get_bind().dialect.name == "postgresql":
+            # IDs were given explicitly; move the sequences past them
+            for table in ("users", "projects", "tasks"):
+                db.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"))
+            db.commit()
+    return {"users": users, "projects": projects, "tasks": tasks, "seed": seed}
+
+
+def dataset_size() -> Dict[str, int]:
+    """Highest ID of each table; the load test picks random rows up to it."""
+    from sqlalchemy import func, select
+
+    from app.database import SessionLocal
+    from app.models import Project, Task, User
+
+    with SessionLocal() as db:
+        return {
+            "users": db.scalar(select(func.max(User.id))) or 0,
+            "projects": db.scalar(select(func.max(Project.id))) or 0,
+            "tasks": db.scalar(select(func.max(Task.id))) or 0,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="SQLite file to create, or a SQLAlchemy URL")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--projects", type=int)
+    parser.add_argument("--tasks", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    users, projects, tasks = SCALES[args.scale]
+    os.environ["DATABASE_URL"] = args.db if "://" in args.db else f"sqlite:///{os.path.abspath(args.db)}"
+    started = time.perf_counter()
+    result = seed_dataset(args.users or users, args.projects or projects, args.tasks or tasks, args.seed)
+    result["seconds"] = round(time.perf_counter() - started, 1)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
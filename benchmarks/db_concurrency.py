@@ -0,0 +1,138 @@
+"""
+Compare request concurrency of the sync and async database modes.
+
+Runs the app in-process once per mode (DATABASE_ASYNC=0 and 1), each
+against its own throwaway SQLite database, fires concurrent requests at
+a few read endpoints and prints throughput and latency percentiles as
+JSON:
+
+    python -m benchmarks.db_concurrency --requests 2000 --concurrency 50
+
+With --db the runs use that database instead, e.g. a local PostgreSQL;
+its tables are dropped and reseeded for every run:
+
+    python -m benchmarks.db_concurrency --db postgresql+psycopg://bench@localhost/bench
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ENDPOINTS = ["/projects/?limit=100", "/tasks/?limit=100", "/auth/users/me"]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def fresh_schema() -> None:
+    """Create the tables, dropping those a previous run left behind."""
+    import app.models  # noqa: F401  registers every table
+    from app.database import Base, engine
+    from app.schema_setup import setup_schema
+
+    Base.metadata.drop_all(bind=engine)
+    setup_schema("create")
+
+
+def seed(projects: int, tasks_per_project: int) -> None:
+    from app.database import SessionLocal
+    from app.models import Project, Task, User
+
+    db = SessionLocal()
+    user = User(username="bench", email="bench@example.com", hashed_password=User.hash_password("bench"))
+    db.add(user)
+    db.flush()
+    db.add_all(Project(name=f"Project {i}", description="x" * 200, owner_id=user.id) for i in range(projects))
+    db.flush()
+    db.add_all(
+        Task(title=f"Task {i}", description="y" * 500, project_id=1 + i % projects)
+        for i in range(projects * tasks_per_project)
+    )
+    db.commit()
+    db.close()
+
+
+async def drive(total: int, concurrency: int) -> dict:
+    import httpx
+    from app.main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        response = await client.post("/auth/token", data={"username": "bench", "password": "bench"})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        latencies = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(ENDPOINTS[i % len(ENDPOINTS)], headers=headers)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 2),
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+        },
+    }
+
+
+def run_child(args) -> None:
+    fresh_schema()
+    seed(args.projects, args.tasks_per_project)
+    result = asyncio.run(drive(args.requests, args.concurrency))
+    print(json.dumps(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--tasks-per-project", type=int, default=10)
+    parser.add_argument("--db", help="SQLAlchemy URL of a scratch database (default: throwaway SQLite)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    results = {}
+    for mode, flag in (("sync", "0"), ("async", "1")):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                DATABASE_URL=args.db or f"sqlite:///{tmp}/bench.db",
+                DATABASE_ASYNC=flag,
+                BCRYPT_ROUNDS="4",
+            )
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.db_concurrency", "--child", *sys.argv[1:]],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
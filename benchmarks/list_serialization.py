@@ -0,0 +1,135 @@
+"""
+Compare the two ways a list endpoint can build its JSON body.
+
+- orm_pydantic: load ORM objects and run them through FastAPI's
+  response_model handling (pydantic from_attributes validation, then
+  JSONResponse). This was the path of the list endpoints before.
+- core_orjson: select plain column rows with SQLAlchemy Core and encode
+  them with orjson (app/services/fast_json.py), as the list endpoints do
+  with `fields=all`.
+- summary: core_orjson of the summary fields only, which the list
+  endpoints return by default (app/services/fieldsets.py), with the
+  body size of each path.
+
+All include the query. The first two bodies are checked for equality before
+timing. Runs against a throwaway SQLite database, or the scratch database
+given with --db (its tables are dropped and reseeded), and prints JSON:
+
+    python -m benchmarks.list_serialization --limits 100 1000 --iterations 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+from benchmarks.db_concurrency import fresh_schema, seed
+
+
+def time_calls(fn, iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples: List[float], rows: int) -> dict:
+    mean = statistics.mean(samples)
+    return {
+        "ms_per_response": round(mean * 1000, 3),
+        "responses_per_s": round(1 / mean, 1),
+        "rows_per_s": round(rows / mean),
+    }
+
+
+def compare(entity: str, limit: int, iterations: int) -> dict:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from sqlalchemy import select
+
+    from app.database import SessionLocal
+    from app.models import Project, Task
+    from app.routers.projects import PROJECT_FIELDS
+    from app.routers.tasks import TASK_FIELDS
+    from app.schemas.project import Project as ProjectSchema
+    from app.schemas.task import Task as TaskSchema
+    from app.services import fast_json
+
+    model, schema, fieldset = {
+        "tasks": (Task, TaskSchema, TASK_FIELDS),
+        "projects": (Project, ProjectSchema, PROJECT_FIELDS),
+    }[entity]
+    columns = fast_json.schema_columns(model, schema)
+    summary_columns = fieldset.columns(fieldset.summary)
+    field = create_response_field(name=f"Response_{entity}", type_=List[schema])
+    loop = asyncio.new_event_loop()
+
+    def orm_pydantic() -> bytes:
+        with SessionLocal() as db:
+            objects = db.scalars(select(model).order_by(model.id).limit(limit)).all()
+            content = loop.run_until_complete(
+                serialize_response(field=field, response_content=objects, is_coroutine=True)
+            )
+        return JSONResponse(content).body
+
+    def core_orjson() -> bytes:
+        with SessionLocal() as db:
+            rows = db.execute(select(*columns).order_by(model.id).limit(limit)).all()
+        return fast_json.rows_response(rows).body
+
+    def summary() -> bytes:
+        with SessionLocal() as db:
+            rows = db.execute(select(*summary_columns).order_by(model.id).limit(limit)).all()
+        return fast_json.rows_response(rows).body
+
+    baseline, optimized = orm_pydantic(), core_orjson()
+    if json.loads(baseline) != json.loads(optimized):
+        raise AssertionError(f"{entity}: the two paths produce different JSON")
+    rows = len(json.loads(optimized))
+
+    old = summarize(time_calls(orm_pydantic, iterations), rows)
+    new = summarize(time_calls(core_orjson, iterations), rows)
+    light = summarize(time_calls(summary, iterations), rows)
+    loop.close()
+    old["bytes"], new["bytes"], light["bytes"] = len(baseline), len(optimized), len(summary())
+    return {
+        "rows": rows,
+        "orm_pydantic": old,
+        "core_orjson": new,
+        "summary": light,
+        "speedup": round(old["ms_per_response"] / new["ms_per_response"], 2),
+        "summary_speedup": round(new["ms_per_response"] / light["ms_per_response"], 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limits", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--tasks-per-project", type=int, default=2)
+    parser.add_argument("--db", help="SQLAlchemy URL of a scratch database (default: throwaway SQLite)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = args.db or f"sqlite:///{tmp}/bench.db"
+        os.environ.setdefault("BCRYPT_ROUNDS", "4")
+        fresh_schema()
+        seed(args.projects, args.tasks_per_project)
+
+        results = {
+            f"{entity}?limit={limit}": compare(entity, limit, args.iterations)
+            for entity in ("tasks", "projects")
+            for limit in args.limits
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Load test of the hot API endpoints against a seeded dataset.
+
+Every scenario sends --requests requests with --concurrency in flight,
+after --warmup unrecorded ones, and records throughput, status codes and
+latency percentiles. Two modes:
+
+- asgi: the app runs in this process behind httpx's ASGI transport, so
+  the numbers cover the app and database without the network or server.
+- http: the app runs under uvicorn with --workers processes and requests
+  go over --concurrency keep-alive connections.
+
+Results are written as JSON (see benchmarks.compare to diff two runs):
+
+    python -m benchmarks.datagen --scale medium --db /tmp/bench.db
+    python -m benchmarks.load --db /tmp/bench.db --mode http --workers 4 --output before.json
+    python -m benchmarks.load --db /tmp/bench.db --scenarios list_tasks get_task
+
+Without --db a throwaway SQLite database is seeded at --scale. Update
+scenarios write to the database, so reseed to compare like with like.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.datagen import PASSWORD, SCALES, dataset_size, seed_dataset
+from benchmarks.db_concurrency import percentile
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+TOKEN_USERS = 20  # distinct users whose tokens authenticate the requests
+
+TASK_STATUSES = ["todo", "in_progress", "done"]
+
+
+def _random_user(rng: random.Random, size: Dict[str, int]) -> str:
+    return f"user{rng.randint(1, size['users'])}"
+
+
+# scenario -> builder of one request: (method, url, keyword arguments)
+SCENARIOS: Dict[str, Callable[[random.Random, Dict[str, int]], tuple]] = {
+    "login": lambda rng, size: (
+        "POST", "/auth/token", {"data": {"username": _random_user(rng, size), "password": PASSWORD}}
+    ),
+    "users_me": lambda rng, size: ("GET", "/auth/users/me", {}),
+    "list_tasks": lambda rng, size: ("GET", "/tasks/?limit=100", {}),
+    "list_projects": lambda rng, size: ("GET", "/projects/?limit=100", {}),
+    "due_soon": lambda rng, size: ("GET", "/tasks/due-soon?limit=100", {}),
+    "overdue": lambda rng, size: ("GET", "/tasks/overdue?limit=100", {}),
+    "get_task": lambda rng, size: ("GET", f"/tasks/{rng.randint(1, size['tasks'])}", {}),
+    "get_project": lambda rng, size: ("GET", f"/projects/{rng.randint(1, size['projects'])}", {}),
+    "update_task": lambda rng, size: (
+        "PUT", f"/tasks/{rng.randint(1, size['tasks'])}", {"json": {"status": rng.choice(TASK_STATUSES)}}
+    ),
+    "update_project": lambda rng, size: (
+        "PUT", f"/projects/{rng.randint(1, size['projects'])}", {"json": {"description": f"edited {rng.random()}"}}
+    ),
+}
+
+
+async def login_tokens(client, size: Dict[str, int], count: int) -> List[dict]:
+    headers = []
+    for i in range(1, min(count, size["users"]) + 1):
+        response = await client.post("/auth/token", data={"username": f"user{i}", "password": PASSWORD})
+        response.raise_for_status()
+        headers.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+    return headers
+
+
+async def run_scenario(client, name: str, size: Dict[str, int], auth: List[dict],
+                       total: int, concurrency: int, warmup: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    build = SCENARIOS[name]
+    # Build every request up front so that only sending them is timed
+    requests = [build(rng, size) for _ in range(warmup + total)]
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    next_index = 0
+
+    async def worker(stop: int, record: bool) -> None:
+        nonlocal next_index
+        while next_index < stop:
+            index = next_index
+            next_index += 1
+            method, url, kwargs = requests[index]
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=auth[index % len(auth)], **kwargs)
+                status = str(response.status_code)
+            except Exception as exc:  # e.g. a timeout or a dropped connection
+                status = type(exc).__name__
+            if record:
+                latencies.append(time.perf_counter() - started)
+                statuses[status] += 1
+
+    await asyncio.gather(*(worker(warmup, False) for _ in range(concurrency)))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(warmup + total, True) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": sum(count for status, count in statuses.items() if not status.startswith("2")),
+        "status_codes": dict(statuses),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 3),
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+    }
+
+
+async def run_all(client, args, size: Dict[str, int]) -> Dict[str, dict]:
+    auth = await login_tokens(client, size, TOKEN_USERS)
+    results = {}
+    for index, name in enumerate(args.scenarios):
+        print(f"{name}...", file=sys.stderr, flush=True)
+        results[name] = await run_scenario(
+            client, name, size, auth, args.requests, args.concurrency, args.warmup, args.seed + index
+        )
+    return results
+
+
+async def run_asgi(args, size: Dict[str, int]) -> Dict[str, dict]:
+    import httpx
+
+    from app.main import app
+
+    # The lifespan starts what a worker runs beside requests, e.g. the deadline scheduler
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=60) as client:
+            return await run_all(client, args, size)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_http(args, size: Dict[str, int]) -> Dict[str, dict]:
+    import httpx
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            for _ in range(300):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise SystemExit("uvicorn exited during startup")
+                await asyncio.sleep(0.1)
+            return await run_all(client, args, size)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="seeded SQLite file or SQLAlchemy URL (default: seed a throwaway one)")
+    parser.add_argument("--scale", choices=SCALES, default="small", help="dataset seeded when --db is not given")
+    parser.add_argument("--mode", choices=["asgi", "http"], default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes in http mode")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000, help="recorded requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="unrecorded requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<time>-<mode>.json)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.db:
+            os.environ["DATABASE_URL"] = args.db if "://" in args.db else f"sqlite:///{os.path.abspath(args.db)}"
+        else:
+            os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+            seed_dataset(*SCALES[args.scale], seed=args.seed)
+        size = dataset_size()
+        run = run_http if args.mode == "http" else run_asgi
+        results = asyncio.run(run(args, size))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "commit": _git_commit(),
+            "mode": args.mode,
+            "workers": args.workers if args.mode == "http" else None,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "dataset": size,
+            "database": os.environ["DATABASE_URL"].split("://")[0],
+            "database_async": os.getenv("DATABASE_ASYNC", "0"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{args.mode}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
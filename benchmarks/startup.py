@@ -0,0 +1,118 @@
+"""
+Measure how quickly a worker comes up.
+
+Each run starts a fresh interpreter against a throwaway SQLite database
+and records:
+
+- import: seconds to import app.main;
+- ready: seconds from spawning uvicorn until /health answers (import,
+  lifespan schema setup and server start);
+- first/second request latency of a few endpoints, where the first
+  request pays for lazily imported dependencies (Jinja for pages,
+  passlib and jose for sign-up and login).
+
+The median of --runs runs is printed as JSON, and written to --output:
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.load import _free_port, _git_commit
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+# (name, method, url, keyword arguments) in the order they are sent
+REQUESTS = [
+    ("health", "GET", "/health", {}),
+    ("page", "GET", "/", {}),
+    ("signup", "POST", "/users/", {"json": {"username": "startup", "email": "s@example.com", "password": "pw"}}),
+    ("login", "POST", "/auth/token", {"data": {"username": "startup", "password": "pw"}}),
+]
+
+
+def _environment(tmp: str) -> dict:
+    env = os.environ.copy()
+    env["DATABASE_URL"] = f"sqlite:///{tmp}/startup.db"
+    env.setdefault("BCRYPT_ROUNDS", "4")
+    return env
+
+
+def measure_import(env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_boot(env: dict) -> Dict[str, float]:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env,
+    )
+    result = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            while True:
+                try:
+                    if client.get("/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise SystemExit("uvicorn exited during startup")
+                time.sleep(0.005)
+            result["ready_s"] = time.perf_counter() - started
+
+            for name, method, url, kwargs in REQUESTS:
+                for attempt in ("first", "second"):
+                    sent = time.perf_counter()
+                    response = client.request(method, url, **kwargs)
+                    result[f"{name}_{attempt}_ms"] = (time.perf_counter() - sent) * 1000
+                    if response.status_code >= 400 and not (name == "signup" and attempt == "second"):
+                        raise SystemExit(f"{method} {url} failed: {response.status_code} {response.text}")
+    finally:
+        server.terminate()
+        server.wait()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="also write the result to this file")
+    args = parser.parse_args()
+
+    samples: Dict[str, List[float]] = {}
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = _environment(tmp)
+            samples.setdefault("import_s", []).append(measure_import(env))
+        with tempfile.TemporaryDirectory() as tmp:
+            for key, value in measure_boot(_environment(tmp)).items():
+                samples.setdefault(key, []).append(value)
+
+    report = {
+        "meta": {"commit": _git_commit(), "runs": args.runs, "python": sys.version.split()[0]},
+        "results": {key: round(statistics.median(values), 4) for key, values in samples.items()},
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Check how many SQL statements each write endpoint sends per request.
+
+Every create and update is an INSERT/UPDATE ... RETURNING of the row
+(app/services/writes.py), followed at commit by the bookkeeping upserts
+(counters, versions, rollups, task events) and, for projects, the tag
+sync; nothing re-reads the row it has just written.
+The endpoints are called in this process against a fresh schema and the
+statements each request executes are counted. A count over its budget
+fails the run, so a reintroduced refresh or pre-update load shows up:
+
+    python -m benchmarks.write_statements
+    python -m benchmarks.write_statements --db postgresql+psycopg://bench@/scratch --verbose
+
+The budgets are those of SQLite, whose writer connections also send
+BEGIN IMMEDIATE and which reads the old status or project of a task
+before updating it; PostgreSQL, in either DATABASE_ASYNC mode, stays
+one to two statements below them. --db takes the URL of a scratch
+database: its tables are dropped and recreated. The same budgets are
+asserted by tests/test_write_statements.py, which this script extends
+with the SQL of each request and the delete endpoints.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from typing import Callable, Dict, List, Tuple
+
+# endpoint -> (method, path, JSON body, statement budget); run in this order
+ENDPOINTS: Dict[str, Tuple[str, str, dict, int]] = {
+    "create_user": ("POST", "/users/", {"username": "writer2", "email": "writer2@example.com", "password": "pw"}, 3),
+    "update_user": ("PUT", "/users/2", {"full_name": "Writer Two"}, 3),
+    "create_project": ("POST", "/projects/", {"name": "Launch", "tags": "web, api"}, 7),
+    "update_project": ("PUT", "/projects/1", {"description": "Edited", "status": "active"}, 4),
+    "update_project_tags": ("PUT", "/projects/1", {"tags": "web"}, 7),
+    "create_task": ("POST", "/tasks/", {"title": "Write docs", "project_id": 1, "due_date": "2030-01-01T00:00:00"}, 5),
+    "update_task": ("PUT", "/tasks/1", {"title": "Write the docs"}, 3),
+    "update_task_status": ("PUT", "/tasks/1", {"status": "done"}, 6),
+    "move_task": ("PUT", "/tasks/1", {"project_id": 2}, 6),
+    "delete_task": ("DELETE", "/tasks/1", {}, 5),
+    "delete_user": ("DELETE", "/users/2", {}, 5),
+}
+
+
+def statement_counter() -> Tuple[List[str], Callable[[], None]]:
+    """Collects every statement sent to any engine until the returned stop()."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(Engine, "after_cursor_execute", record)
+    return statements, lambda: event.remove(Engine, "after_cursor_execute", record)
+
+
+async def run() -> Dict[str, dict]:
+    import httpx
+
+    from app.main import app
+    from benchmarks.db_concurrency import fresh_schema
+
+    fresh_schema()
+    results = {}
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        # A user to authenticate as and a second project to move a task to;
+        # the first authenticated request also fills the principal cache
+        await client.post("/users/", json={"username": "writer", "email": "writer@example.com", "password": "pw"})
+        token = (await client.post("/auth/token", data={"username": "writer", "password": "pw"})).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+        await client.post("/projects/", json={"name": "Other"}, headers=headers)
+        await client.get("/auth/users/me", headers=headers)
+
+        statements, stop = statement_counter()
+        try:
+            for name, (method, path, body, budget) in ENDPOINTS.items():
+                statements.clear()
+                response = await client.request(method, path, json=body or None, headers=headers)
+                response.raise_for_status()
+                results[name] = {
+                    "request": f"{method} {path}",
+                    "statements": len(statements),
+                    "budget": budget,
+                    "sql": list(statements),
+                }
+        finally:
+            stop()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="SQLAlchemy URL of a scratch database (default: throwaway SQLite)")
+    parser.add_argument("--verbose", action="store_true", help="print the statements of every request")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = args.db or f"sqlite:///{tmp}/bench.db"
+        os.environ.setdefault("BCRYPT_ROUNDS", "4")
+        # Nothing but the requests may run SQL while they are counted
+        os.environ["DEADLINE_RELOAD_SECONDS"] = "0"
+        os.environ["ROLLUP_COMPACT_INTERVAL_SECONDS"] = "0"
+        os.environ["SLOW_QUERY_EXPLAIN"] = "0"
+        results = asyncio.run(run())
+
+    if not args.verbose:
+        for result in results.values():
+            del result["sql"]
+    print(json.dumps(results, indent=2))
+    over = [name for name, result in results.items() if result["statements"] > result["budget"]]
+    if over:
+        print(f"Over their statement budget: {', '.join(over)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -36,43 +36,30 @@ async function loadDashboardData() {
     const token = localStorage.getItem('access_token');
     
     try {
-        // Load projects count
-        const projectsResponse = await fetch('/projects/', {
+        // Counts come from server-side counters, not from downloading every row
+        const summaryResponse = await fetch('/stats/summary', {
             headers: {
                 'Authorization': `Bearer ${token}`
             }
         });
         
-        if (projectsResponse.ok) {
-            const projects = await projectsResponse.json();
-            document.getElementById('projects-count').textContent = projects.length;
-            
-            // Load projects into table
-            loadProjectsTable(projects);
+        if (summaryResponse.ok) {
+            const summary = await summaryResponse.json();
+            document.getElementById('projects-count').textContent = summary.projects.total;
+            document.getElementById('tasks-count').textContent = summary.tasks.total;
+            document.getElementById('users-count').textContent = summary.users.total;
         }
         
-        // Load tasks count
-        const tasksResponse = await fetch('/tasks/', {
+        // Load projects into table, with only the fields it shows
+        const projectsResponse = await fetch('/projects/?fields=name,status,created_at,progress', {
             headers: {
                 'Authorization': `Bearer ${token}`
             }
         });
         
-        if (tasksResponse.ok) {
-            const tasks = await tasksResponse.json();
-            document.getElementById('tasks-count').textContent = tasks.length;
-        }
-        
-        // Load users count
-        const usersResponse = await fetch('/users/', {
-            headers: {
-                'Authorization': `Bearer ${token}`
-            }
-        });
-        
-        if (usersResponse.ok) {
-            const users = await usersResponse.json();
-            document.getElementById('users-count').textContent = users.length;
+        if (projectsResponse.ok) {
+            const projects = await projectsResponse.json();
+            loadProjectsTable(projects);
         }
         
     } catch (error) {
@@ -120,11 +107,14 @@ function loadProjectsTable(projects) {
                 statusBadge = '<span class="badge bg-secondary">Unknown</span>';
         }
         
+        // Task counts come inline with the project (see rollups)
+        const progress = project.progress || { total: 0, percent_done: 0 };
+        
         // Set row content
         row.innerHTML = `
             <td>${project.name}</td>
             <td>${statusBadge}</td>
-            <td>0</td>
+            <td>${progress.total} <small class="text-muted">(${progress.percent_done}% done)</small></td>
             <td>${formattedDate}</td>
             <td>
                 <button class="btn btn-sm btn-outline-primary me-1" data-id="${project.id}">
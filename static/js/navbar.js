@@ -172,39 +172,20 @@ async function performDropdownSearch(searchTerm) {
         const token = localStorage.getItem('access_token');
         if (!token) return;
         
-        // Fetch projects
-        const projectsResponse = await fetch('/projects/', {
+        // One indexed query on the server, top 3 results of each type
+        const response = await fetch(`/search/?q=${encodeURIComponent(searchTerm)}&limit=3`, {
             headers: {
                 'Authorization': `Bearer ${token}`
             }
         });
         
-        // Fetch tasks
-        const tasksResponse = await fetch('/tasks/', {
-            headers: {
-                'Authorization': `Bearer ${token}`
-            }
-        });
-        
-        if (!projectsResponse.ok || !tasksResponse.ok) {
+        if (!response.ok) {
             throw new Error('Failed to fetch data');
         }
         
-        const projects = await projectsResponse.json();
-        const tasks = await tasksResponse.json();
-        
-        // Filter projects and tasks based on search term
-        const filteredProjects = projects.filter(project => 
-            project.name.toLowerCase().includes(searchTerm) || 
-            (project.description && project.description.toLowerCase().includes(searchTerm)) ||
-            project.status.toLowerCase().includes(searchTerm)
-        ).slice(0, 3); // Limit to top 3 results
-        
-        const filteredTasks = tasks.filter(task => 
-            task.title.toLowerCase().includes(searchTerm) || 
-            (task.description && task.description.toLowerCase().includes(searchTerm)) ||
-            task.status.toLowerCase().includes(searchTerm)
-        ).slice(0, 3); // Limit to top 3 results
+        const results = await response.json();
+        const filteredProjects = results.projects;
+        const filteredTasks = results.tasks;
         
         // Render dropdown results
         renderDropdownResults(filteredProjects, filteredTasks, searchTerm);
@@ -22,6 +22,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Load tasks for the project
     loadProjectTasks(projectId);
     
+    // Apply other viewers' changes as they happen
+    openChangeFeed(projectId);
+    
     // Setup event listeners
     setupEventListeners(projectId);
 });
@@ -87,6 +90,7 @@ async function loadProjectData(projectId) {
         
         if (response.ok) {
             const project = await response.json();
+            currentProject = project;
             displayProjectData(project);
         } else {
             console.error('Error loading project data');
@@ -168,81 +172,179 @@ function displayProjectData(project) {
     }
 }
 
+// Board column status -> task list element ID
+const BOARD_COLUMN_LISTS = {
+    'todo': 'todo-tasks',
+    'in_progress': 'in-progress-tasks',
+    'done': 'done-tasks'
+};
+const BOARD_PAGE_SIZE = 50;
+
+async function fetchBoard(projectId, params = '') {
+    const token = localStorage.getItem('access_token');
+    const response = await fetch(`/projects/${projectId}/board?limit=${BOARD_PAGE_SIZE}${params}`, {
+        headers: {
+            'Authorization': `Bearer ${token}`
+        }
+    });
+    if (!response.ok) {
+        throw new Error(`Board request failed with status ${response.status}`);
+    }
+    return response.json();
+}
+
 async function loadProjectTasks(projectId) {
     try {
-        const token = localStorage.getItem('access_token');
-        const response = await fetch(`/tasks/?project_id=${projectId}`, {
-            headers: {
-                'Authorization': `Bearer ${token}`
-            }
-        });
-        
-        if (response.ok) {
-            const tasks = await response.json();
-            displayTasks(tasks);
-        } else {
-            console.error('Error loading tasks');
-        }
+        // Columns arrive grouped, priority-ordered and counted by the server
+        const board = await fetchBoard(projectId);
+        displayTasks(projectId, board.columns);
     } catch (error) {
         console.error('Error loading tasks:', error);
     }
 }
 
-function displayTasks(tasks) {
-    // Clear task lists
-    const todoList = document.getElementById('todo-tasks');
-    const inProgressList = document.getElementById('in-progress-tasks');
-    const doneList = document.getElementById('done-tasks');
-    
-    todoList.innerHTML = '';
-    inProgressList.innerHTML = '';
-    doneList.innerHTML = '';
-    
-    // Add empty state messages
-    addEmptyStateMessage(todoList, 'Drop tasks here');
-    addEmptyStateMessage(inProgressList, 'Drop tasks here');
-    addEmptyStateMessage(doneList, 'Drop tasks here');
-    
-    // Sort tasks by priority (high to low)
-    tasks.sort((a, b) => {
-        const priorityOrder = { 'high': 0, 'medium': 1, 'low': 2 };
-        return priorityOrder[a.priority || 'low'] - priorityOrder[b.priority || 'low'];
+function displayTasks(projectId, columns) {
+    boardTasks.clear();
+    columns.forEach(column => {
+        const list = document.getElementById(BOARD_COLUMN_LISTS[column.status]);
+        list.innerHTML = '';
+        addEmptyStateMessage(list, 'Drop tasks here');
+        appendColumnTasks(projectId, list, column, 0);
+        toggleEmptyStateMessage(list, column.count === 0);
     });
+}
+
+function appendColumnTasks(projectId, list, column, shown) {
+    column.tasks.forEach(task => {
+        // Live updates may already have placed this task
+        if (!boardTasks.has(task.id)) {
+            boardTasks.set(task.id, task);
+            list.appendChild(createTaskElement(task));
+        }
+    });
+    shown += column.tasks.length;
     
-    // Count tasks by status
-    const taskCounts = {
-        'todo': 0,
-        'in_progress': 0,
-        'done': 0
-    };
+    if (!column.next_cursor) {
+        return;
+    }
     
-    // Group tasks by status
-    tasks.forEach(task => {
-        const taskElement = createTaskElement(task);
-        
-        switch (task.status) {
-            case 'todo':
-                todoList.appendChild(taskElement);
-                taskCounts.todo++;
-                break;
-            case 'in_progress':
-                inProgressList.appendChild(taskElement);
-                taskCounts.in_progress++;
-                break;
-            case 'done':
-                doneList.appendChild(taskElement);
-                taskCounts.done++;
-                break;
-            default:
-                todoList.appendChild(taskElement);
-                taskCounts.todo++;
+    // Fetch the next page of this column only
+    const moreButton = document.createElement('button');
+    moreButton.className = 'btn btn-sm btn-outline-secondary w-100 mt-2 load-more-btn';
+    moreButton.textContent = `Load more (${column.count - shown} remaining)`;
+    moreButton.addEventListener('click', async () => {
+        moreButton.disabled = true;
+        try {
+            const params = `&column=${column.status}&cursor=${encodeURIComponent(column.next_cursor)}`;
+            const board = await fetchBoard(projectId, params);
+            moreButton.remove();
+            appendColumnTasks(projectId, list, board.columns[0], shown);
+        } catch (error) {
+            moreButton.disabled = false;
+            console.error('Error loading tasks:', error);
         }
     });
+    list.appendChild(moreButton);
+}
+
+// Live updates: the server pushes compact task/project deltas over SSE
+let changeFeed = null;
+let currentProject = null;
+// Tasks currently rendered on the board, by ID
+const boardTasks = new Map();
+const PRIORITY_RANK = { 'high': 0, 'medium': 1, 'low': 2 };
+
+function isChangeFeedOpen() {
+    return changeFeed !== null && changeFeed.readyState === EventSource.OPEN;
+}
+
+function openChangeFeed(projectId) {
+    const token = localStorage.getItem('access_token');
+    // EventSource reconnects on its own and resumes from the last event ID
+    changeFeed = new EventSource(`/projects/${projectId}/events?access_token=${encodeURIComponent(token)}`);
     
-    // Show/hide empty state messages based on task counts
-    toggleEmptyStateMessage(todoList, taskCounts.todo === 0);
-    toggleEmptyStateMessage(inProgressList, taskCounts.in_progress === 0);
-    toggleEmptyStateMessage(doneList, taskCounts.done === 0);
+    changeFeed.addEventListener('task.created', event => {
+        placeTask(projectId, JSON.parse(event.data));
+    });
+    changeFeed.addEventListener('task.updated', event => {
+        const delta = JSON.parse(event.data);
+        const known = boardTasks.get(delta.id);
+        if (known) {
+            placeTask(projectId, { ...known, ...delta });
+        } else {
+            // Not loaded yet (beyond the first page): fetch it once
+            loadTask(delta.id).then(task => task && placeTask(projectId, task));
+        }
+    });
+    changeFeed.addEventListener('task.deleted', event => {
+        removeTask(JSON.parse(event.data).id);
+    });
+    changeFeed.addEventListener('project.updated', event => {
+        if (currentProject) {
+            currentProject = { ...currentProject, ...JSON.parse(event.data) };
+            displayProjectData(currentProject);
+        }
+    });
+    changeFeed.addEventListener('project.deleted', () => {
+        changeFeed.close();
+        window.location.href = '/projects';
+    });
+    // Events were missed (slow connection or too long offline): resync
+    changeFeed.addEventListener('reset', () => {
+        loadProjectData(projectId);
+        loadProjectTasks(projectId);
+    });
+}
+
+async function loadTask(taskId) {
+    const token = localStorage.getItem('access_token');
+    const response = await fetch(`/tasks/${taskId}`, {
+        headers: {
+            'Authorization': `Bearer ${token}`
+        }
+    });
+    return response.ok ? response.json() : null;
+}
+
+function taskSortKey(task) {
+    const rank = PRIORITY_RANK[task.priority] ?? 3;
+    return [rank, task.id];
+}
+
+function compareTasks(a, b) {
+    const [rankA, idA] = taskSortKey(a);
+    const [rankB, idB] = taskSortKey(b);
+    return rankA - rankB || idA - idB;
+}
+
+function removeTask(taskId) {
+    boardTasks.delete(taskId);
+    const element = document.querySelector(`.task-card[data-id="${taskId}"]`);
+    if (element) {
+        const list = element.parentElement;
+        element.remove();
+        toggleEmptyStateMessage(list, list.querySelector('.task-card') === null);
+    }
+}
+
+function placeTask(projectId, task) {
+    removeTask(task.id);
+    if (String(task.project_id) !== String(projectId)) {
+        return;
+    }
+    
+    const list = document.getElementById(BOARD_COLUMN_LISTS[task.status] || BOARD_COLUMN_LISTS.todo);
+    const cards = Array.from(list.querySelectorAll('.task-card'));
+    const before = cards.find(card => compareTasks(task, boardTasks.get(Number(card.dataset.id))) < 0);
+    const moreButton = list.querySelector('.load-more-btn');
+    if (!before && moreButton) {
+        // Sorts after the loaded page; it will arrive with "Load more"
+        return;
+    }
+    
+    boardTasks.set(task.id, task);
+    list.insertBefore(createTaskElement(task), before || moreButton);
+    toggleEmptyStateMessage(list, false);
 }
 
 function addEmptyStateMessage(container, message) {
@@ -438,8 +540,10 @@ async function saveTask(projectId) {
             const taskModal = bootstrap.Modal.getInstance(document.getElementById('taskModal'));
             taskModal.hide();
             
-            // Reload tasks
-            loadProjectTasks(projectId);
+            // The change feed delivers the change; reload only without it
+            if (!isChangeFeedOpen()) {
+                loadProjectTasks(projectId);
+            }
         } else {
             const error = await response.json();
             alert(`Error: ${error.detail || 'Failed to save task'}`);
@@ -597,28 +701,50 @@ window.drop = async function(ev, status) {
         list.classList.remove('drag-over');
     });
     
+    // Moves made in quick succession are sent together in one batch request
+    pendingMoves.set(Number(taskId), status);
+    clearTimeout(flushMovesTimer);
+    flushMovesTimer = setTimeout(flushPendingMoves, MOVE_BATCH_DELAY_MS);
+};
+
+// Task status changes waiting to be sent, keyed by task ID
+const pendingMoves = new Map();
+const MOVE_BATCH_DELAY_MS = 150;
+let flushMovesTimer = null;
+
+async function flushPendingMoves() {
+    if (pendingMoves.size === 0) {
+        return;
+    }
+    const updates = Array.from(pendingMoves, ([id, status]) => ({ id, status }));
+    pendingMoves.clear();
+    
     const token = localStorage.getItem('access_token');
     
     try {
-        const response = await fetch(`/tasks/${taskId}`, {
-            method: 'PUT',
+        const response = await fetch('/tasks/batch', {
+            method: 'PATCH',
             headers: {
                 'Content-Type': 'application/json',
                 'Authorization': `Bearer ${token}`
             },
-            body: JSON.stringify({
-                status: status
-            })
+            body: JSON.stringify(updates)
         });
         
         if (response.ok) {
-            // Reload tasks
-            const projectId = getProjectIdFromUrl();
-            loadProjectTasks(projectId);
+            const data = await response.json();
+            data.results.filter(result => !result.ok).forEach(result => {
+                console.error(`Error updating task ${result.id}: ${result.error}`);
+            });
         } else {
             console.error('Error updating task status');
         }
     } catch (error) {
         console.error('Error updating task status:', error);
     }
-};
+    
+    // The change feed delivers the moves; reload only without it
+    if (!isChangeFeedOpen()) {
+        loadProjectTasks(getProjectIdFromUrl());
+    }
+}
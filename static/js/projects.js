@@ -79,8 +79,8 @@ async function loadProjects() {
             </div>
         `;
         
-        // Load projects from API
-        const response = await fetch('/projects/', {
+        // Load projects from API; the cards show descriptions, which the list leaves out by default
+        const response = await fetch('/projects/?fields=all', {
             headers: {
                 'Authorization': `Bearer ${token}`
             }
@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when the app is imported: use a throwaway database
+# and keep background jobs from sharing the writer with the requests
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ["METRICS_ENABLED"] = "1"
+os.environ["DEADLINE_RELOAD_SECONDS"] = "0"
+os.environ["ROLLUP_COMPACT_INTERVAL_SECONDS"] = "0"
+os.environ["SLOW_QUERY_EXPLAIN"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def headers(client):
+    client.post("/users/", json={"username": "writer", "email": "writer@example.com", "password": "pw"})
+    token = client.post("/auth/token", data={"username": "writer", "password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    # Fills the principal cache, so requests below do not look the user up
+    client.get("/auth/users/me", headers=headers).raise_for_status()
+    return headers
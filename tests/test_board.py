@@ -0,0 +1,45 @@
+"""Paging through a column of GET /projects/{id}/board."""
+import base64
+import json
+
+import pytest
+
+PRIORITIES = ["low", "high", None, "medium", "high", "low"]
+
+
+@pytest.fixture(scope="module")
+def project_id(client, headers) -> int:
+    response = client.post("/projects/", json={"name": "Board"}, headers=headers)
+    response.raise_for_status()
+    project_id = response.json()["id"]
+    for index, priority in enumerate(PRIORITIES):
+        client.post("/tasks/", json={"title": f"Task {index}", "project_id": project_id, "status": "todo",
+                                     "priority": priority}, headers=headers).raise_for_status()
+    return project_id
+
+
+def column(client, headers, project_id: int, **params) -> dict:
+    response = client.get(f"/projects/{project_id}/board", params={"column": "todo", **params}, headers=headers)
+    response.raise_for_status()
+    return response.json()["columns"][0]
+
+
+def test_pages(client, headers, project_id):
+    every = [task["id"] for task in column(client, headers, project_id)["tasks"]]
+    assert len(every) == len(PRIORITIES)
+    paged, cursor = [], None
+    while True:
+        page = column(client, headers, project_id, limit=2, **({"cursor": cursor} if cursor else {}))
+        paged += [task["id"] for task in page["tasks"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert paged == every
+
+
+@pytest.mark.parametrize("keys", [{"rank": 9, "id": 1}, {"rank": -1, "id": 1}, {"rank": 0, "id": "1"}, {"rank": 0}])
+def test_invalid_cursor(client, headers, project_id, keys):
+    cursor = base64.urlsafe_b64encode(json.dumps(keys).encode()).decode().rstrip("=")
+    response = client.get(f"/projects/{project_id}/board", params={"column": "todo", "cursor": cursor},
+                          headers=headers)
+    assert response.status_code == 400
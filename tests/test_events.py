@@ -0,0 +1,46 @@
+"""Resuming a project's change feed from Last-Event-ID."""
+import pytest
+
+from app.services.events import RESET_EVENT, ChangeFeed
+
+
+def queued(subscription) -> list:
+    frames = []
+    while not subscription.queue.empty():
+        frames.append(subscription.queue.get_nowait().split("\n")[1].split(": ", 1)[1])
+    return frames
+
+
+@pytest.fixture
+def feed():
+    return ChangeFeed(history_size=3, max_queued=10)
+
+
+def test_resumes_after_last_event_id(feed):
+    first = feed.publish(1, "task.created", {"id": 1})
+    feed.publish(2, "task.created", {"id": 2})
+    feed.publish(1, "task.updated", {"id": 1})
+    assert queued(feed.subscribe(1, feed.event_id(first))) == ["task.updated"]
+    assert queued(feed.subscribe(1, feed.event_id(feed.last_id))) == []
+
+
+@pytest.mark.parametrize("last_event_id", [
+    "0",  # no epoch
+    "abc-1",  # another process
+    "{epoch}-9",  # ahead of this feed
+    "{epoch}-1",  # no longer buffered
+    "{epoch}-x",
+])
+def test_resets(feed, last_event_id):
+    for number in range(5):
+        feed.publish(1, "task.created", {"id": number})
+    assert queued(feed.subscribe(1, last_event_id.format(epoch=feed.epoch))) == [RESET_EVENT]
+
+
+def test_new_epoch_after_restart(feed):
+    # A restarted process counts from 1 again, past the client's last ID
+    client_saw = feed.event_id(feed.publish(1, "task.created", {"id": 1}))
+    restarted = ChangeFeed(history_size=3, max_queued=10)
+    for number in range(3):
+        restarted.publish(1, "task.created", {"id": number})
+    assert queued(restarted.subscribe(1, client_saw)) == [RESET_EVENT]
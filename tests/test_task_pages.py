@@ -0,0 +1,42 @@
+"""
+Paging of GET /tasks, whose filters may split the query into one
+segment per status (and per dated/undated phase when sorted by due
+date) that are merged into the page.
+"""
+import pytest
+
+STATUSES = ["todo", "done", "in_progress", "todo", "done", "todo", "done", "in_progress"]
+
+
+@pytest.fixture(scope="module")
+def project_id(client, headers) -> int:
+    """A project whose tasks mix statuses, every other one without a due date."""
+    response = client.post("/projects/", json={"name": "Paging"}, headers=headers)
+    response.raise_for_status()
+    project_id = response.json()["id"]
+    for index, status in enumerate(STATUSES):
+        due_date = f"2030-01-{len(STATUSES) - index:02d}T00:00:00" if index % 2 else None
+        client.post("/tasks/", json={"title": f"Task {index}", "project_id": project_id, "status": status,
+                                     "due_date": due_date}, headers=headers).raise_for_status()
+    return project_id
+
+
+def ids(client, headers, params: dict) -> list:
+    response = client.get("/tasks/", params={**params, "fields": "id"}, headers=headers)
+    response.raise_for_status()
+    return [task["id"] for task in response.json()]
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"status": "todo"},
+    {"status": ["todo", "done"]},
+    {"sort": "due_date"},
+    {"sort": "due_date", "status": ["todo", "done"]},
+])
+def test_skip(client, headers, project_id, params):
+    params = {**params, "project_id": project_id}
+    every = ids(client, headers, {**params, "limit": 100})
+    assert len(every) > 2
+    for skip in range(len(every) + 1):
+        assert ids(client, headers, {**params, "limit": 2, "skip": skip}) == every[skip:skip + 2]
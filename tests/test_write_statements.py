@@ -0,0 +1,116 @@
+"""
+SQL statements per request of the create and update endpoints.
+
+Creates and updates return the row from INSERT/UPDATE ... RETURNING
+(app/services/writes.py), so a request is the write itself plus the
+counter, version and rollup upserts at commit. The budgets are those of
+SQLite, whose writer connections send BEGIN IMMEDIATE and which reads
+the old status or project before an update that changes it; PostgreSQL
+(TEST_DATABASE_URL) stays below them. A refresh after the commit or a
+load before the update goes over.
+"""
+import pytest
+
+from app import metrics
+
+
+@pytest.fixture
+def request_stats(monkeypatch):
+    """The RequestStats of every request made by the test, in order."""
+    recorded = []
+
+    class RecordedStats(metrics.RequestStats):
+        __slots__ = ()
+
+        def __init__(self):
+            super().__init__()
+            recorded.append(self)
+
+    monkeypatch.setattr(metrics, "RequestStats", RecordedStats)
+    return recorded
+
+
+@pytest.fixture
+def statements(client, headers, request_stats):
+    """Sends a request and returns its response and how many statements it ran."""
+
+    def send(method: str, path: str, body: dict):
+        request_stats.clear()
+        response = client.request(method, path, json=body, headers=headers)
+        assert response.status_code < 300, response.text
+        assert len(request_stats) == 1
+        # A write that counts no statements means the hook is not counting
+        assert request_stats[0].queries > 0
+        return response.json(), request_stats[0].queries
+
+    return send
+
+
+def create_project(client, headers, **values) -> dict:
+    response = client.post("/projects/", json={"name": "Project", **values}, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+
+def create_task(client, headers, project_id: int, **values) -> dict:
+    response = client.post("/tasks/", json={"title": "Task", "project_id": project_id, **values}, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+
+def test_create_user(statements):
+    user, count = statements("POST", "/users/", {"username": "ada", "email": "ada@example.com", "password": "pw"})
+    assert user["username"] == "ada"
+    assert count <= 3
+
+
+def test_update_user(statements):
+    user, _ = statements("POST", "/users/", {"username": "bob", "email": "bob@example.com", "password": "pw"})
+    user, count = statements("PUT", f"/users/{user['id']}", {"full_name": "Bob"})
+    assert user["full_name"] == "Bob"
+    assert count <= 3
+
+
+@pytest.mark.parametrize("values, budget", [
+    ({}, 3),
+    # Tag links are synced with four more statements
+    ({"tags": "web, api"}, 7),
+])
+def test_create_project(statements, values, budget):
+    project, count = statements("POST", "/projects/", {"name": "Launch", **values})
+    assert project["name"] == "Launch"
+    assert count <= budget
+
+
+@pytest.mark.parametrize("values, budget", [
+    ({"description": "Edited"}, 3),
+    ({"status": "active"}, 4),
+    ({"tags": "web"}, 7),
+])
+def test_update_project(client, headers, statements, values, budget):
+    project = create_project(client, headers)
+    project, count = statements("PUT", f"/projects/{project['id']}", values)
+    assert project.items() >= values.items()
+    assert count <= budget
+
+
+def test_create_task(client, headers, statements):
+    project = create_project(client, headers)
+    task, count = statements("POST", "/tasks/", {"title": "Write docs", "project_id": project["id"]})
+    assert task["project_id"] == project["id"]
+    assert count <= 5
+
+
+@pytest.mark.parametrize("values, budget", [
+    ({"title": "Write the docs"}, 3),
+    ({"status": "done"}, 6),
+    ({"project_id": None}, 6),  # moves the task to a second project
+])
+def test_update_task(client, headers, statements, values, budget):
+    project = create_project(client, headers)
+    task = create_task(client, headers, project["id"])
+    if "project_id" in values:
+        values = {"project_id": create_project(client, headers)["id"]}
+    task, count = statements("PUT", f"/tasks/{task['id']}", values)
+    assert task.items() >= values.items()
+    assert count <= budget